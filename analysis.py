@@ -0,0 +1,245 @@
+import argparse
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from bot import BotPlayer
+from engine import GameEngine
+from timing import ManualClock
+
+METRICS = ("clicks", "mismatches", "score", "time")
+
+
+@dataclass(frozen=True)
+class PlayerModel:
+    # memory None remembers every tile seen
+    memory: Optional[int] = None
+    error_rate: float = 0.0
+
+    def __post_init__(self):
+        if self.memory is not None and self.memory < 2:
+            raise ValueError(f"memory must hold at least the 2 tiles of a turn, not {self.memory}")
+
+    @property
+    def label(self) -> str:
+        memory = "all" if self.memory is None else str(self.memory)
+        return f"memory={memory} error={self.error_rate:g}"
+
+
+class MetricStats:
+    # Mergeable running aggregate of one metric. Values are bucketed in a
+    # histogram (times to 0.1 s) so percentiles survive merging chunks.
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+        self.histogram: Counter = Counter()
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.total_sq += value * value
+        self.minimum = min(self.minimum, value)
+        self.maximum = max(self.maximum, value)
+        self.histogram[round(value, 1)] += 1
+
+    def merge(self, other: "MetricStats") -> None:
+        self.count += other.count
+        self.total += other.total
+        self.total_sq += other.total_sq
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+        self.histogram.update(other.histogram)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    @property
+    def std(self) -> float:
+        if self.count < 2:
+            return 0.0
+        return math.sqrt(max(self.total_sq / self.count - self.mean ** 2, 0.0))
+
+    def percentile(self, q: float) -> float:
+        target = q / 100 * self.count
+        seen = 0
+        for value in sorted(self.histogram):
+            seen += self.histogram[value]
+            if seen >= target:
+                return value
+        return 0.0
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "mean": self.mean, "std": self.std, "min": self.minimum, "max": self.maximum,
+            "p50": self.percentile(50), "p95": self.percentile(95), "p99": self.percentile(99),
+        }
+
+
+# Per-level stats keyed by level number, plus "game" for whole-game totals
+Aggregate = Dict[str, Dict[str, MetricStats]]
+
+
+def new_aggregate(levels: Sequence[int]) -> Aggregate:
+    return {str(key): {metric: MetricStats() for metric in METRICS} for key in (*levels, "game")}
+
+
+def merge_aggregate(into: Aggregate, other: Aggregate) -> None:
+    for key, metrics in other.items():
+        for metric, stats in metrics.items():
+            into[key][metric].merge(stats)
+
+
+def play_game(model: PlayerModel, game_seed: int, think_time: float) -> List[Tuple[int, Dict[str, float]]]:
+    # One seeded game through the real engine rules; returns each level's
+    # clicks, mismatches, score and simulated play time
+    clock = ManualClock()
+    engine = GameEngine(clock=clock, rng=random.Random(game_seed))
+    player = BotPlayer(engine, clock, random.Random(f"{game_seed}/player"), memory=model.memory,
+                       error_rate=model.error_rate, think_time=think_time)
+    results = []
+    while True:
+        before = (player.clicks, player.mismatches, engine.state.score, clock.now)
+        player.play_level()
+        results.append((engine.state.level, {
+            "clicks": player.clicks - before[0],
+            "mismatches": player.mismatches - before[1],
+            "score": engine.state.score - before[2],
+            "time": clock.now - before[3],
+        }))
+        if engine.is_final_level:
+            return results
+        engine.start_next_level()
+
+
+def play_chunk(task: Tuple[int, PlayerModel, int, int, int, float]) -> Tuple[int, int, float, Aggregate]:
+    # Pool worker: plays games [start, start + count) of one model. Game i
+    # gets the same board for every model so models are compared on equal deals.
+    model_index, model, start, count, seed, think_time = task
+    began = time.perf_counter()
+    aggregate = new_aggregate(sorted(GameEngine.LEVELS))
+    for game in range(start, start + count):
+        totals = dict.fromkeys(METRICS, 0.0)
+        for level, values in play_game(model, (seed << 32) + game, think_time):
+            for metric, value in values.items():
+                aggregate[str(level)][metric].add(value)
+                totals[metric] += value
+        for metric, value in totals.items():
+            aggregate["game"][metric].add(value)
+    return model_index, count, time.perf_counter() - began, aggregate
+
+
+def chunk_tasks(models: Sequence[PlayerModel], games: int, chunk: int, seed: int,
+                think_time: float) -> Iterator[Tuple[int, PlayerModel, int, int, int, float]]:
+    # Interleaved across models so partial results cover every model early
+    for start in range(0, games, chunk):
+        for index, model in enumerate(models):
+            yield index, model, start, min(chunk, games - start), seed, think_time
+
+
+def summarize(aggregate: Aggregate) -> Dict[str, Dict[str, Dict[str, float]]]:
+    return {key: {metric: stats.summary() for metric, stats in metrics.items()}
+            for key, metrics in aggregate.items()}
+
+
+def single_core_rate(models: Sequence[PlayerModel], games: int, seed: int, think_time: float) -> float:
+    # Baseline for scaling efficiency: the same mix of models, played in this
+    # process without the pool
+    per_model = max(games // len(models), 1)
+    count = elapsed = 0.0
+    for index, model in enumerate(models):
+        _, played, seconds, _ = play_chunk((index, model, 0, per_model, seed, think_time))
+        count += played
+        elapsed += seconds
+    return count / elapsed
+
+
+def run_analysis(models: Sequence[PlayerModel], games: int, out_path: str, workers: int,
+                 chunk: int = 2000, seed: int = 0, think_time: float = 1.0,
+                 baseline_games: int = 500) -> Dict:
+    baseline = single_core_rate(models, baseline_games, seed, think_time)
+    levels = sorted(GameEngine.LEVELS)
+    aggregates = [new_aggregate(levels) for _ in models]
+    done = [0] * len(models)
+
+    start = time.perf_counter()
+    with open(out_path, "w") as out, multiprocessing.Pool(workers) as pool:
+        tasks = chunk_tasks(models, games, chunk, seed, think_time)
+        for model_index, count, _, aggregate in pool.imap_unordered(play_chunk, tasks):
+            merge_aggregate(aggregates[model_index], aggregate)
+            done[model_index] += count
+            # One line per finished chunk with the model's running totals
+            out.write(json.dumps({
+                "model": models[model_index].label,
+                "games": done[model_index],
+                "elapsed": time.perf_counter() - start,
+                "levels": summarize(aggregates[model_index]),
+            }) + "\n")
+            out.flush()
+        wall = time.perf_counter() - start
+
+        total_games = sum(done)
+        rate = total_games / wall
+        report = {
+            "games": total_games,
+            "workers": workers,
+            "wall_seconds": wall,
+            "games_per_second": rate,
+            "games_per_second_per_core": rate / workers,
+            "single_core_games_per_second": baseline,
+            "scaling_efficiency": rate / (workers * baseline),
+            "models": {model.label: summarize(aggregate) for model, aggregate in zip(models, aggregates)},
+        }
+        out.write(json.dumps({"final": report}) + "\n")
+    return report
+
+
+def parse_memory(value: str) -> Optional[int]:
+    if value == "all":
+        return None
+    if int(value) < 2:
+        raise argparse.ArgumentTypeError(f"must be at least 2 (the tiles of one turn) or 'all', not {value}")
+    return int(value)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Monte Carlo difficulty analysis of the standard levels")
+    parser.add_argument("--games", type=int, default=100_000, help="games per player model")
+    parser.add_argument("--memory", type=parse_memory, nargs="+", default=[None, 8, 4],
+                        help="tiles each player model remembers ('all' for perfect memory)")
+    parser.add_argument("--error-rate", type=float, nargs="+", default=[0.0, 0.1],
+                        help="chance that recalling a remembered tile fails")
+    parser.add_argument("--think-time", type=float, default=1.0,
+                        help="simulated seconds before each click")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk", type=int, default=2000, help="games per pool task")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", type=str, default="analysis.jsonl",
+                        help="JSON lines file; running totals are appended as chunks finish")
+    args = parser.parse_args()
+
+    models = [PlayerModel(memory, error) for memory, error in itertools.product(args.memory, args.error_rate)]
+    report = run_analysis(models, args.games, args.out, args.workers, args.chunk, args.seed, args.think_time)
+
+    print(f"{'model':<24}{'level':>6}{'clicks':>9}{'mismatches':>12}{'score':>8}{'time':>8}")
+    for label, levels in report["models"].items():
+        for level, metrics in levels.items():
+            print(f"{label:<24}{level:>6}{metrics['clicks']['mean']:9.1f}{metrics['mismatches']['mean']:12.1f}"
+                  f"{metrics['score']['mean']:8.1f}{metrics['time']['mean']:7.1f}s")
+    print(f"{report['games']} games in {report['wall_seconds']:.1f}s on {report['workers']} workers: "
+          f"{report['games_per_second']:.0f} games/s, {report['games_per_second_per_core']:.0f} per core, "
+          f"{report['scaling_efficiency']:.0%} scaling efficiency")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import heapq
+import itertools
+import math
+from typing import Callable, List, Optional, Tuple
+
+Easing = Callable[[float], float]
+
+
+def linear(t: float) -> float:
+    return t
+
+
+def ease_in_out(t: float) -> float:
+    # Smoothstep: symmetric, so the midpoint stays at 0.5
+    return t * t * (3 - 2 * t)
+
+
+def ease_in_cubic(t: float) -> float:
+    return t * t * t
+
+
+def ease_out_cubic(t: float) -> float:
+    return 1 - (1 - t) ** 3
+
+
+def ease_out_back(t: float) -> float:
+    # Overshoots slightly before settling, for things that pop in
+    c = 1.70158
+    return 1 + (c + 1) * (t - 1) ** 3 + c * (t - 1) ** 2
+
+
+class Tween:
+    # Calls on_update with the eased progress (0 to 1) while running, then
+    # on_done once. Tweens chained with then() start when this one ends.
+    __slots__ = ("start", "duration", "easing", "on_update", "on_done", "cancelled", "_next")
+
+    def __init__(self, start: float, duration: float, on_update: Optional[Callable[[float], None]] = None,
+                 on_done: Optional[Callable[[], None]] = None, easing: Easing = linear):
+        self.start = start
+        self.duration = duration
+        self.easing = easing
+        self.on_update = on_update
+        self.on_done = on_done
+        self.cancelled = False
+        self._next: List["Tween"] = []
+
+    @property
+    def end(self) -> float:
+        return self.start + self.duration
+
+    def value(self, t: float) -> float:
+        if self.duration <= 0:
+            return 1.0
+        return self.easing(min(max((t - self.start) / self.duration, 0.0), 1.0))
+
+    def then(self, duration: float, on_update: Optional[Callable[[float], None]] = None,
+             on_done: Optional[Callable[[], None]] = None, easing: Easing = linear) -> "Tween":
+        tween = Tween(self.end, duration, on_update, on_done, easing)
+        self._next.append(tween)
+        return tween
+
+    def cancel(self) -> None:
+        # Cancels this tween and everything chained after it
+        self.cancelled = True
+        for tween in self._next:
+            tween.cancel()
+
+
+class Timeline:
+    # Running tweens kept in a heap ordered by end time. Finishing a tween is
+    # a heap pop, and a frame only touches the tweens that are running, so
+    # the cost follows the number of animations, not the size of the scene.
+    def __init__(self):
+        self._heap: List[Tuple[float, int, Tween]] = []
+        self._counter = itertools.count()
+
+    def add(self, start: float, duration: float, on_update: Optional[Callable[[float], None]] = None,
+            on_done: Optional[Callable[[], None]] = None, easing: Easing = linear) -> Tween:
+        return self.play(Tween(start, duration, on_update, on_done, easing))
+
+    def play(self, tween: Tween) -> Tween:
+        heapq.heappush(self._heap, (tween.end, next(self._counter), tween))
+        return tween
+
+    def update(self, t: float) -> None:
+        heap = self._heap
+        while heap and heap[0][0] <= t:
+            _, _, tween = heapq.heappop(heap)
+            if tween.cancelled:
+                continue
+            if tween.on_update is not None:
+                tween.on_update(tween.easing(1.0))
+            if tween.on_done is not None:
+                tween.on_done()
+            # Successors may already be over too; the loop finishes them in order
+            for successor in tween._next:
+                if not successor.cancelled:
+                    self.play(successor)
+        for _, _, tween in heap:
+            if not tween.cancelled and tween.on_update is not None and t >= tween.start:
+                tween.on_update(tween.value(t))
+
+    def next_end(self) -> float:
+        while self._heap and self._heap[0][2].cancelled:
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else math.inf
+
+    def clear(self) -> None:
+        for _, _, tween in self._heap:
+            tween.cancel()
+        self._heap.clear()
+
+    def __len__(self) -> int:
+        return sum(1 for _, _, tween in self._heap if not tween.cancelled)
@@ -0,0 +1,100 @@
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import pygame
+
+ASSET_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
+ICON_SHEET = os.path.join(ASSET_DIR, "element_icons.png")
+BACKGROUND_MUSIC = os.path.join(ASSET_DIR, "background_music.mp3")
+
+
+class SpriteAtlas:
+    # Slices a sheet of square element icons laid out in a grid. By default
+    # the sheet is one row, so the icon size is the sheet height.
+    def __init__(self, sheet: pygame.Surface, rows: int = 1):
+        self.sheet = sheet
+        cell = sheet.get_height() // rows
+        columns = sheet.get_width() // cell if cell else 0
+        self.icons: List[pygame.Surface] = [
+            sheet.subsurface((col * cell, row * cell, cell, cell))
+            for row in range(rows)
+            for col in range(columns)
+        ]
+        self._scaled: Dict[int, List[pygame.Surface]] = {}
+
+    def __len__(self) -> int:
+        return len(self.icons)
+
+    def scaled(self, size: int) -> List[pygame.Surface]:
+        # Pre-scaled once per size, then reused for every tile of that size
+        icons = self._scaled.get(size)
+        if icons is None:
+            icons = self._scaled[size] = [pygame.transform.smoothscale(icon, (size, size)) for icon in self.icons]
+        return icons
+
+    def icon(self, element: int, size: int) -> pygame.Surface:
+        return self.scaled(size)[element % len(self.icons)]
+
+
+class AssetLoader:
+    # Decodes the icon sheet on a worker thread while the start screen runs.
+    # Conversion to the display format needs the display, so poll() finishes
+    # it on the main thread once decoding is done.
+    def __init__(self, icon_sheet: str = ICON_SHEET, music: str = BACKGROUND_MUSIC, icon_rows: int = 1):
+        self.icon_sheet = icon_sheet
+        self.music = music
+        self.icon_rows = icon_rows
+        self.atlas: Optional[SpriteAtlas] = None
+        self.errors: List[Tuple[str, str]] = []
+        self.music_started = False
+        self._decoded: Optional[pygame.Surface] = None
+        self._done = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._decode, name="asset-loader", daemon=True)
+        self._thread.start()
+
+    def _decode(self) -> None:
+        try:
+            self._decoded = pygame.image.load(self.icon_sheet)
+        except (pygame.error, FileNotFoundError) as exc:
+            self.errors.append((self.icon_sheet, str(exc)))
+        finally:
+            self._done.set()
+
+    @property
+    def ready(self) -> bool:
+        return self._done.is_set()
+
+    def poll(self) -> Optional[SpriteAtlas]:
+        # Returns the atlas exactly once, on the first call after it is ready
+        if not self._done.is_set() or self._decoded is None:
+            return None
+        sheet = self._decoded
+        self._decoded = None
+        if pygame.display.get_surface() is not None:
+            sheet = sheet.convert_alpha()
+        self.atlas = SpriteAtlas(sheet, self.icon_rows)
+        return self.atlas if len(self.atlas) else None
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[SpriteAtlas]:
+        self._done.wait(timeout)
+        return self.poll()
+
+    def start_music(self, volume: float = 0.5) -> bool:
+        # pygame.mixer.music streams from disk instead of decoding the whole file
+        if self.music_started:
+            return True
+        try:
+            if not pygame.mixer.get_init():
+                pygame.mixer.init()
+            pygame.mixer.music.load(self.music)
+            pygame.mixer.music.set_volume(volume)
+            pygame.mixer.music.play(-1)
+        except (pygame.error, FileNotFoundError) as exc:
+            self.errors.append((self.music, str(exc)))
+            return False
+        self.music_started = True
+        return True
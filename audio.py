@@ -0,0 +1,195 @@
+import argparse
+import os
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pygame
+
+FREQUENCY = 44100
+# Frames per device buffer. 256 is under 6 ms at 44.1 kHz; pygame's default
+# of 512 doubles that, and every buffer queued ahead of a sound delays it.
+BUFFER = 256
+VOICES = 8
+
+# (note Hz, start s, length s) per effect, with its waveform
+Note = Tuple[float, float, float]
+EFFECTS: Dict[str, Tuple[str, Sequence[Note]]] = {
+    "flip": ("sine", [(880.0, 0.0, 0.05)]),
+    "match": ("sine", [(1046.5, 0.0, 0.12), (1318.5, 0.08, 0.25)]),
+    "mismatch": ("square", [(196.0, 0.0, 0.12), (174.6, 0.1, 0.18)]),
+    "level": ("sine", [(1046.5, 0.0, 0.15), (1318.5, 0.1, 0.15), (1568.0, 0.2, 0.15), (2093.0, 0.3, 0.35)]),
+}
+# When every voice is busy a sound may only take the voice of one with the
+# same or lower priority, so a burst of flips never cuts off a match chime
+PRIORITY = {"flip": 0, "mismatch": 1, "match": 2, "level": 3}
+
+
+def pre_init(buffer: int = BUFFER, frequency: int = FREQUENCY) -> None:
+    # Only takes effect if it runs before the mixer is first initialized
+    pygame.mixer.pre_init(frequency, -16, 2, buffer)
+
+
+def synthesize(name: str, frequency: int = FREQUENCY, volume: float = 0.35) -> np.ndarray:
+    # Mono float samples in [-1, 1]; each note rises over 2 ms (no click)
+    # and decays exponentially
+    waveform, notes = EFFECTS[name]
+    length = max(start + duration for _, start, duration in notes)
+    samples = np.zeros(int(length * frequency) + 1, dtype=np.float32)
+    for hz, start, duration in notes:
+        t = np.arange(int(duration * frequency), dtype=np.float32) / frequency
+        wave = np.sin(2 * np.pi * hz * t)
+        if waveform == "square":
+            wave = np.sign(wave) * 0.5
+        envelope = np.minimum(t / 0.002, 1.0) * np.exp(-t * 5 / duration)
+        first = int(start * frequency)
+        samples[first:first + len(t)] += wave * envelope
+    return np.clip(samples * volume, -1.0, 1.0)
+
+
+def make_sound(samples: np.ndarray) -> pygame.mixer.Sound:
+    # Converted once to the mixer's own format so playing never resamples
+    _, size, channels = pygame.mixer.get_init()
+    if size == 32:
+        data = samples
+    elif abs(size) == 16:
+        data = (samples * 32767).astype(np.int16 if size < 0 else np.uint16)
+    else:
+        data = (samples * 127 + (0 if size < 0 else 128)).astype(np.int8 if size < 0 else np.uint8)
+    if channels > 1:
+        data = np.repeat(data[:, None], channels, axis=1)
+    return pygame.sndarray.make_sound(np.ascontiguousarray(data))
+
+
+class AudioSystem:
+    # Sound effects are synthesized and converted to the mixer format once at
+    # start, so play() only picks a voice and hands SDL a ready buffer. Music
+    # streams through pygame.mixer.music, which decodes in the audio thread
+    # and stays out of this pool. Construct it before anything initializes
+    # the mixer so the small buffer is used.
+    def __init__(self, voices: int = VOICES, buffer: int = BUFFER, enabled: bool = True):
+        self.voices = voices
+        self.buffer = buffer
+        self.enabled = enabled
+        self.started = False
+        self.sounds: Dict[str, pygame.mixer.Sound] = {}
+        self.channels: List[pygame.mixer.Channel] = []
+        # (frequency, size, channels) the mixer actually opened with
+        self.format: Optional[Tuple[int, int, int]] = None
+        self.errors: List[str] = []
+        self.played = 0
+        self.stolen = 0
+        self.dropped = 0
+        # Seconds from reading the input event to the sound being queued
+        self.dispatch: Deque[float] = deque(maxlen=1000)
+        # (priority, start time) of the sound last given to each voice
+        self._voice_info: List[Tuple[int, float]] = []
+        if enabled and not pygame.mixer.get_init():
+            pre_init(buffer)
+
+    def start(self) -> bool:
+        self.started = True
+        if not self.enabled:
+            return False
+        try:
+            if not pygame.mixer.get_init():
+                pygame.mixer.init()
+            pygame.mixer.set_num_channels(self.voices)
+            self.channels = [pygame.mixer.Channel(i) for i in range(self.voices)]
+            self.format = pygame.mixer.get_init()
+            self.sounds = {name: make_sound(synthesize(name, self.format[0])) for name in EFFECTS}
+        except pygame.error as exc:
+            self.errors.append(str(exc))
+            self.enabled = False
+            return False
+        self._voice_info = [(0, 0.0)] * self.voices
+        return True
+
+    def _voice(self, priority: int) -> Optional[int]:
+        # A free voice, else the oldest sound of the lowest priority not above ours
+        victim = None
+        for index, channel in enumerate(self.channels):
+            if not channel.get_busy():
+                return index
+            if self._voice_info[index][0] <= priority and (
+                    victim is None or self._voice_info[index] < self._voice_info[victim]):
+                victim = index
+        if victim is not None:
+            self.channels[victim].stop()
+            self.stolen += 1
+        return victim
+
+    def play(self, name: str, since: Optional[float] = None) -> bool:
+        sound = self.sounds.get(name)
+        if sound is None:
+            return False
+        priority = PRIORITY[name]
+        index = self._voice(priority)
+        if index is None:
+            self.dropped += 1
+            return False
+        self.channels[index].play(sound)
+        now = time.perf_counter()
+        self._voice_info[index] = (priority, now)
+        self.played += 1
+        if since is not None:
+            self.dispatch.append(now - since)
+        return True
+
+    @property
+    def buffer_ms(self) -> float:
+        # Queued device buffer a new sound waits behind
+        return self.buffer / self.format[0] * 1000 if self.format else 0.0
+
+    def report(self) -> str:
+        if not self.started or not self.enabled:
+            return "audio: off" + (f" ({self.errors[-1]})" if self.errors else "")
+        frequency, size, channels = self.format
+        text = (f"audio: {frequency} Hz, {abs(size)}-bit, {channels} ch, {self.buffer}-frame buffer "
+                f"({self.buffer_ms:.1f} ms); {self.played} sounds, {self.stolen} voices stolen, "
+                f"{self.dropped} dropped")
+        if self.dispatch:
+            p50, p99 = np.percentile(np.array(self.dispatch) * 1000, (50, 99))
+            text += (f"; input to mixer p50 {p50:.2f} ms, p99 {p99:.2f} ms, "
+                     f"~{p99 + self.buffer_ms:.1f} ms to output at p99")
+        return text
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure sound effect latency and voice stealing")
+    parser.add_argument("--voices", type=int, default=VOICES)
+    parser.add_argument("--buffer", type=int, default=BUFFER, help="mixer buffer in sample frames")
+    parser.add_argument("--trials", type=int, default=200, help="sounds played for the dispatch timing")
+    parser.add_argument("--burst", type=int, default=32, help="flips started at once to exercise voice stealing")
+    parser.add_argument("--dummy", action="store_true", help="use SDL's dummy audio driver (no device needed)")
+    args = parser.parse_args()
+    if args.dummy:
+        os.environ["SDL_AUDIODRIVER"] = "dummy"
+
+    began = time.perf_counter()
+    audio = AudioSystem(args.voices, args.buffer)
+    if not audio.start():
+        print(audio.report())
+        raise SystemExit(1)
+    print(f"mixer and {len(audio.sounds)} sounds ready in {(time.perf_counter() - began) * 1000:.1f} ms")
+
+    for _ in range(args.trials):
+        audio.play("flip", since=time.perf_counter())
+    print(audio.report())
+
+    # A burst wider than the pool steals the oldest flips; a chime still
+    # gets a voice while the flips cannot cut it off
+    audio.played = audio.stolen = audio.dropped = 0
+    audio.play("level")
+    for _ in range(args.burst):
+        audio.play("flip")
+    print(f"burst of {args.burst} flips on {args.voices} voices: {audio.played} played, "
+          f"{audio.stolen} stolen, {audio.dropped} dropped, chime still playing: "
+          f"{any(channel.get_sound() is audio.sounds['level'] for channel in audio.channels)}")
+    pygame.mixer.stop()
+    pygame.mixer.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,352 @@
+import os
+
+# Set before pygame is imported so the suite runs without a display or sound card
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import json
+import platform
+import sys
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pygame
+
+from board import LevelSpec, Tile
+from engine import MATCH, MISMATCH
+from matching_game import ScienceGame
+from particles import ParticleField
+
+RESOLUTIONS = ((800, 600), (1280, 720), (1920, 1080))
+BOARDS = ((4, 4), (12, 12), (40, 40))
+PARTICLES = (50, 5000)
+# draw_tile is timed in each of these: (revealed, flip progress or None at rest)
+TILE_STATES = {
+    "hidden": (False, None),
+    "flipping_out": (False, 0.25),
+    "flipping_in": (False, 0.75),
+    "revealed": (True, None),
+}
+
+Samples = List[float]
+Summary = Dict[str, float]
+
+
+class BenchmarkGame(ScienceGame):
+    # Windowed at a fixed size; the dummy driver has no real fullscreen mode
+    resolution = (800, 600)
+
+    def set_screen_mode(self) -> pygame.Surface:
+        return pygame.display.set_mode(self.resolution)
+
+
+def make_game(resolution: Tuple[int, int], board: Optional[Tuple[int, int]] = None) -> BenchmarkGame:
+    BenchmarkGame.resolution = resolution
+    levels = {1: LevelSpec(*board, min_pair_distance=2)} if board else None
+    game = BenchmarkGame(seed=0, levels=levels, music=False, sound=False)
+    # Deal synchronously, so setup_level times generation rather than a pool pop
+    game.board_pool.close()
+    game.engine.pool = None
+    while not game.assets.ready:
+        time.sleep(0.001)
+    game.poll_assets()
+    return game
+
+
+def start_play(game: ScienceGame) -> None:
+    # Straight into play, skipping the countdown
+    game.running = True
+    game.start_countdown(game.timestep.time)
+    game.timers.clear()
+    game.begin_play()
+
+
+def sample(fn: Callable[[], object], count: int, setup: Optional[Callable[[], None]] = None,
+           warmup: int = 5) -> Samples:
+    # Each call is timed on its own; setup runs untimed before every call
+    samples = []
+    for i in range(warmup + count):
+        if setup is not None:
+            setup()
+        began = time.perf_counter()
+        fn()
+        if i >= warmup:
+            samples.append(time.perf_counter() - began)
+    return samples
+
+
+def summarize(samples: Samples) -> Summary:
+    micros = np.array(samples) * 1e6
+    return {
+        "median_us": float(np.median(micros)),
+        "p95_us": float(np.percentile(micros, 95)),
+        "mean_us": float(micros.mean()),
+        "min_us": float(micros.min()),
+        "total_ms": float(micros.sum() / 1000),
+        "samples": len(samples),
+    }
+
+
+def calibrate(count: int) -> Samples:
+    # A fixed mix of interpreter work and pixel fills that no change to the
+    # game touches. It is timed right after every path, so a comparison can
+    # tell a slower path from a machine that was slower at that moment.
+    surface = pygame.Surface((256, 256))
+
+    def reference() -> None:
+        total = 0
+        for i in range(2000):
+            total += i * i
+        for shade in range(16):
+            surface.fill((shade, shade, shade))
+
+    return sample(reference, count)
+
+
+def reset_board(game: ScienceGame) -> None:
+    # Every tile face down and unmatched again, with nothing pending
+    board, engine = game.board, game.engine
+    board.revealed[:] = False
+    board.matched[:] = False
+    board.active.clear()
+    board.changed.clear()
+    engine.timers.clear()
+    engine.waiting_for_reset = False
+    engine.state.selected_tile = None
+    engine.state.matched_pairs.clear()
+    engine.state.matches_found = 0
+
+
+def click_script(game: ScienceGame) -> List[Tuple[int, int]]:
+    # Click positions for one deliberate mismatch, then every pair in turn
+    board = game.board
+    first: Dict[int, int] = {}
+    pairs = []
+    for cell, color in zip(board.cells.tolist(), board.layout()):
+        if color in first:
+            pairs.append((first[color], cell))
+        else:
+            first[color] = cell
+    cells = [pairs[0][0], pairs[1][0]] + [cell for pair in pairs for cell in pair]
+    return [game.tile_rect(board.position(cell)).center for cell in cells]
+
+
+def bench_screen(resolution: Tuple[int, int], count: int, particles: Sequence[int]) -> Iterator[Tuple[str, Callable[[], Samples]]]:
+    game = make_game(resolution)
+    yield "draw_start_screen", lambda: sample(game.draw_start_screen, count)
+    for particle_count in particles:
+        game.particles = ParticleField(game.screen.get_size(), particle_count, seed=0)
+        yield f"update_particles[{particle_count}]", lambda: sample(game.update_particles, count)
+    game.particles = ParticleField(game.screen.get_size(), 50, seed=0)
+
+    start_play(game)
+
+    def tick_clock() -> None:
+        # The HUD clock text changes every few frames, as in play
+        game.state.game_time += 1 / 60
+
+    yield "draw_laboratory_ui", lambda: sample(game.draw_laboratory_ui, count, tick_clock)
+    yield "full_game", lambda: play_scripted_game(make_game(resolution))
+
+
+def bench_board(resolution: Tuple[int, int], board_size: Tuple[int, int], count: int) -> Iterator[Tuple[str, Callable[[], Samples]]]:
+    game = make_game(resolution, board_size)
+    start_play(game)
+    board = game.board
+    index = int(board.cells[0])
+    tile = Tile(board, index)
+    rect = game.tile_rect(board.position(index))
+    for state, (revealed, progress) in TILE_STATES.items():
+        board.revealed[index] = revealed
+        board.active.discard(index)
+        if progress is not None:
+            board.active.add(index)
+            board.flip_progress[index] = progress
+        yield f"draw_tile[{state}]", lambda: sample(lambda: game.draw_tile(tile, rect), count)
+    reset_board(game)
+
+    yield "setup_level", lambda: sample(game.setup_level, max(count // 10, 5))
+
+
+def bench_logic(board_size: Tuple[int, int], count: int) -> Iterator[Tuple[str, Callable[[], Samples]]]:
+    # Game logic does not depend on the window, so it runs at one resolution
+    game = make_game(RESOLUTIONS[0], board_size)
+    start_play(game)
+    board = game.board
+
+    now = [0.0]
+    cells = board.cells.tolist()
+    for label, flipping in (("2", cells[:2]), ("all", cells)):
+        def start_flips(flipping=flipping) -> None:
+            now[0] += 1 / 120
+            if not board.active:
+                for cell in flipping:
+                    board.start_flip(cell, now[0])
+
+        yield f"update_tiles[{label}]", lambda: sample(lambda: game.update_tiles(now[0]), count, start_flips)
+    reset_board(game)
+
+    script: List[Tuple[int, int]] = []
+    outcomes: List[str] = []
+
+    def next_click() -> None:
+        if game.engine.waiting_for_reset or not script:
+            reset_board(game)
+        if not script:
+            script.extend(reversed(click_script(game)))
+
+    def click() -> None:
+        outcomes.append(game.handle_click(script.pop(), now[0]))
+
+    yield "handle_click", lambda: sample(click, count, next_click)
+    assert not outcomes or (MATCH in outcomes and MISMATCH in outcomes)
+
+
+def play_scripted_game(game: ScienceGame, max_frames: int = 10000) -> Samples:
+    # Both standard levels played through ScienceGame at 60 rendered frames
+    # per second of simulation time: a deliberate mismatch, then every pair.
+    # Each sample is one frame's logic steps plus render.
+    game.running = True
+    game.start_countdown(game.timestep.time)
+    steps_per_frame = max(round(1 / (game.timestep.step * 60)), 1)
+    script: List[Tuple[int, int]] = []
+    level = None
+    frames = []
+    while game.running and len(frames) < max_frames:
+        began = time.perf_counter()
+        board_ready = (game.state.game_active and not game.transition_active
+                       and not game.engine.waiting_for_reset and not game.board.active)
+        if board_ready:
+            if level != game.state.level:
+                level = game.state.level
+                script = list(reversed(click_script(game)))
+            if script:
+                game.handle_click(script.pop(), game.timestep.time)
+        for _ in range(steps_per_frame):
+            game.step(game.timestep.tick())
+        game.render()
+        frames.append(time.perf_counter() - began)
+    if not game.state.game_complete:
+        raise RuntimeError(f"scripted game stopped at level {game.state.level} after {len(frames)} frames")
+    return frames
+
+
+def run_suite(resolutions: Sequence[Tuple[int, int]], boards: Sequence[Tuple[int, int]], count: int,
+              particles: Sequence[int], only: Sequence[str] = (), rounds: int = 3) -> Dict[str, Summary]:
+    # The whole suite runs `rounds` times and each path keeps its fastest
+    # round, so a burst of load from elsewhere on the machine has to last
+    # through every round to show up as a regression
+    results: Dict[str, Summary] = {}
+    for round_ in range(rounds):
+        print(f"round {round_ + 1} of {rounds}", flush=True)
+        for name, summary in run_round(resolutions, boards, count, particles, only).items():
+            if name not in results or summary["median_us"] < results[name]["median_us"]:
+                results[name] = summary
+    pygame.quit()
+    return results
+
+
+def run_round(resolutions: Sequence[Tuple[int, int]], boards: Sequence[Tuple[int, int]], count: int,
+              particles: Sequence[int], only: Sequence[str]) -> Dict[str, Summary]:
+    results: Dict[str, Summary] = {}
+
+    def record(name: str, run: Callable[[], Samples]) -> None:
+        # Paths are only run once they pass the --only filter
+        if only and not any(part in name for part in only):
+            return
+        results[name] = summarize(run())
+        results[name]["calibration_us"] = float(np.median(calibrate(50))) * 1e6
+        print(f"  {name:<48}{results[name]['median_us']:>12.1f} us", flush=True)
+
+    for resolution in resolutions:
+        res = f"{resolution[0]}x{resolution[1]}"
+        for path, run in bench_screen(resolution, count, particles):
+            record(f"{path} {res}", run)
+        for board_size in boards:
+            size = f"{board_size[0]}x{board_size[1]}"
+            for path, run in bench_board(resolution, board_size, count):
+                record(f"{path} {res} {size}", run)
+    for board_size in boards:
+        size = f"{board_size[0]}x{board_size[1]}"
+        for path, run in bench_logic(board_size, count):
+            record(f"{path} {size}", run)
+    return results
+
+
+def compare(results: Dict[str, Summary], baseline: Dict[str, Summary], threshold: float,
+            normalize: bool = True) -> List[Tuple[str, float, float]]:
+    # Medians against the baseline's; a path slower by more than `threshold`
+    # is a regression. With normalize, each baseline median is first scaled by
+    # how much slower or faster the calibration workload ran next to the path.
+    regressions = []
+    print(f"{'path':<48}{'baseline':>12}{'current':>12}{'change':>9}")
+    for name, summary in results.items():
+        if name not in baseline:
+            print(f"{name:<48}{'-':>12}{summary['median_us']:>10.1f}us{'new':>9}")
+            continue
+        speed = summary["calibration_us"] / baseline[name]["calibration_us"] if normalize else 1.0
+        before = baseline[name]["median_us"] * speed
+        ratio = summary["median_us"] / before if before else 1.0
+        flag = "  REGRESSED" if ratio > 1 + threshold else ""
+        print(f"{name:<48}{before:>10.1f}us{summary['median_us']:>10.1f}us{ratio - 1:>+9.0%}{flag}")
+        if flag:
+            regressions.append((name, before, summary["median_us"]))
+    return regressions
+
+
+def parse_size(value: str) -> Tuple[int, int]:
+    width, height = value.lower().split("x")
+    return int(width), int(height)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Time the render and logic hot paths under SDL's dummy drivers")
+    parser.add_argument("--resolutions", type=parse_size, nargs="+", default=list(RESOLUTIONS), metavar="WxH")
+    parser.add_argument("--boards", type=parse_size, nargs="+", default=list(BOARDS), metavar="ROWSxCOLS")
+    parser.add_argument("--particles", type=int, nargs="+", default=list(PARTICLES))
+    parser.add_argument("--count", type=int, default=200, help="timed calls per path (setup_level runs a tenth)")
+    parser.add_argument("--rounds", type=int, default=3, help="runs of the suite; each path keeps its fastest")
+    parser.add_argument("--only", type=str, nargs="+", default=[],
+                        help="only record paths whose name contains one of these")
+    parser.add_argument("--out", type=str, default="benchmarks.json", help="where to write the results")
+    parser.add_argument("--baseline", type=str, default=None,
+                        help="results file to compare against; exits 1 if any path regressed")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed slowdown of a path's median before it counts as a regression")
+    parser.add_argument("--no-normalize", action="store_true",
+                        help="compare raw times instead of scaling the baseline by the calibration workload")
+    args = parser.parse_args()
+
+    began = time.perf_counter()
+    results = run_suite(args.resolutions, args.boards, args.count, args.particles, args.only, args.rounds)
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "sdl": ".".join(map(str, pygame.get_sdl_version())),
+            "platform": platform.platform(),
+            "video_driver": os.environ["SDL_VIDEODRIVER"],
+            "count": args.count,
+            "rounds": args.rounds,
+            "seconds": time.perf_counter() - began,
+        },
+        "results": results,
+    }
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"{len(results)} paths in {report['meta']['seconds']:.1f}s, written to {args.out}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold, not args.no_normalize)
+        if regressions:
+            print(f"{len(regressions)} paths regressed more than {args.threshold:.0%}")
+            sys.exit(1)
+        print(f"no path regressed more than {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
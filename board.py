@@ -0,0 +1,317 @@
+import colorsys
+import random
+from collections.abc import Mapping
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import FrozenSet, Iterator, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+Color = Tuple[int, int, int]
+Position = Tuple[int, int]
+
+FLIP_DURATION = 0.3
+
+BASE_PALETTE: List[Color] = [
+    (230, 25, 75),    # Red
+    (60, 180, 75),    # Green
+    (255, 225, 25),   # Yellow
+    (0, 130, 200),    # Blue
+    (245, 130, 48),   # Orange
+    (145, 30, 180),   # Purple
+    (70, 240, 240),   # Cyan
+    (240, 50, 230),   # Magenta
+    (210, 245, 60),   # Lime
+    (250, 190, 212),  # Pink
+    (0, 128, 128),    # Teal
+    (220, 190, 255),  # Lavender
+]
+
+
+def generate_palette(count: int) -> List[Color]:
+    # The hand-picked colors first, then hues spread by the golden ratio with
+    # varying saturation and value for boards that need more pairs
+    colors = list(BASE_PALETTE[:count])
+    hue = 0.0
+    step = 0
+    while len(colors) < count:
+        hue = (hue + 0.618033988749895) % 1.0
+        step += 1
+        saturation = 0.55 + 0.45 * (step % 3) / 2
+        value = 0.7 + 0.3 * ((step // 3) % 3) / 2
+        r, g, b = colorsys.hsv_to_rgb(hue, saturation, value)
+        colors.append((int(r * 255), int(g * 255), int(b * 255)))
+    return colors
+
+
+def _pair_cells(cells: List[int], cols: int, min_distance: int,
+                rng: random.Random) -> Optional[List[Tuple[int, int]]]:
+    # Greedy random pairing: each cell takes a random unpaired partner at
+    # least min_distance away (Manhattan). A cell left without one is swapped
+    # into an existing pair. None means this attempt got stuck.
+    def far(a: int, b: int) -> bool:
+        (ar, ac), (br, bc) = divmod(a, cols), divmod(b, cols)
+        return abs(ar - br) + abs(ac - bc) >= min_distance
+
+    unpaired = list(cells)
+    rng.shuffle(unpaired)
+    pairs: List[Tuple[int, int]] = []
+    while unpaired:
+        a = unpaired.pop()
+        count = len(unpaired)
+        partner = -1
+        # Sampling finds a partner in a try or two on all but the last few cells
+        for _ in range(min(count, 16)):
+            j = rng.randrange(count)
+            if far(a, unpaired[j]):
+                partner = j
+                break
+        else:
+            candidates = [j for j, b in enumerate(unpaired) if far(a, b)]
+            if candidates:
+                partner = rng.choice(candidates)
+        if partner >= 0:
+            b = unpaired[partner]
+            unpaired[partner] = unpaired[-1]
+            unpaired.pop()
+            pairs.append((a, b))
+            continue
+
+        # Re-pair a with one end of an existing pair and its other end with some b
+        repaired = False
+        for k in rng.sample(range(len(pairs)), len(pairs)):
+            c, e = pairs[k]
+            for j, b in enumerate(unpaired):
+                for x, y in ((c, e), (e, c)):
+                    if far(a, x) and far(b, y):
+                        pairs[k] = (a, x)
+                        pairs.append((b, y))
+                        unpaired[j] = unpaired[-1]
+                        unpaired.pop()
+                        repaired = True
+                        break
+                if repaired:
+                    break
+            if repaired:
+                break
+        if not repaired:
+            return None
+    return pairs
+
+
+def generate_layout(cells: Sequence[int], cols: int, min_distance: int = 0,
+                    rng: Optional[random.Random] = None, attempts: int = 20) -> List[int]:
+    # Colors for `cells` (ascending cell indices), two of each. With
+    # min_distance > 1 the two tiles of a color are at least that far apart
+    # (Manhattan), so 2 forbids side-by-side pairs.
+    if len(cells) % 2:
+        raise ValueError(f"cannot deal {len(cells)} tiles: a board with an odd number of tiles has no layout")
+    rng = rng or random.Random()
+    pair_count = len(cells) // 2
+    if min_distance <= 1:
+        color_pairs = [i for i in range(pair_count) for _ in (0, 1)]
+        rng.shuffle(color_pairs)
+        return color_pairs
+
+    for _ in range(attempts):
+        pairs = _pair_cells(list(cells), cols, min_distance, rng)
+        if pairs is not None:
+            break
+    else:
+        raise ValueError(f"could not place {pair_count} pairs at least {min_distance} apart")
+    colors = list(range(pair_count))
+    rng.shuffle(colors)
+    color_of = {}
+    for color, (a, b) in zip(colors, pairs):
+        color_of[a] = color_of[b] = color
+    return [color_of[cell] for cell in cells]
+
+
+@dataclass(frozen=True)
+class LevelSpec:
+    rows: int
+    cols: int
+    holes: FrozenSet[Position] = frozenset()
+    # Minimum Manhattan distance between the two tiles of a pair; 2 keeps pairs from touching
+    min_pair_distance: int = 0
+
+    def cells(self) -> List[int]:
+        return [r * self.cols + c for r in range(self.rows) for c in range(self.cols) if (r, c) not in self.holes]
+
+
+@lru_cache(maxsize=None)
+def check_spec(spec: LevelSpec) -> None:
+    # Raises ValueError for a spec that can never be dealt: an odd number of
+    # tiles, or a tile with no other tile min_pair_distance away. Both are
+    # cheap, so this runs before the first frame; a spec that passes but still
+    # defeats the generator fails on the board pool's thread instead.
+    cells = np.array(spec.cells(), dtype=np.intp)
+    if len(cells) % 2:
+        raise ValueError(f"a {spec.rows}x{spec.cols} board with {len(spec.holes)} holes has an odd number of tiles")
+    if spec.min_pair_distance <= 1 or not len(cells):
+        return
+    # Distance from each tile to the farthest tile, from the spread of the
+    # board's diagonals (Manhattan distance is the larger diagonal offset)
+    rows, cols = np.divmod(cells, spec.cols)
+    diagonals = [rows + cols, rows - cols]
+    reach = np.max([np.maximum(d - d.min(), d.max() - d) for d in diagonals], axis=0)
+    if reach.min() < spec.min_pair_distance:
+        raise ValueError(f"pairs at least {spec.min_pair_distance} apart do not fit on a {spec.rows}x{spec.cols} "
+                         f"board with {len(spec.holes)} holes")
+
+
+class Tile:
+    # A view of one board cell; the state itself lives in the board's arrays
+    __slots__ = ("board", "index")
+
+    flip_duration = FLIP_DURATION
+
+    def __init__(self, board: "Board", index: int):
+        self.board = board
+        self.index = index
+
+    @property
+    def color_index(self) -> int:
+        return int(self.board.color[self.index])
+
+    @property
+    def color(self) -> Color:
+        return self.board.palette[self.board.color[self.index]]
+
+    @property
+    def revealed(self) -> bool:
+        return bool(self.board.revealed[self.index])
+
+    @property
+    def matched(self) -> bool:
+        return bool(self.board.matched[self.index])
+
+    @property
+    def is_flipping(self) -> bool:
+        return self.index in self.board.active
+
+    @property
+    def flip_progress(self) -> float:
+        return float(self.board.flip_progress[self.index])
+
+    @property
+    def flip_start_time(self) -> float:
+        return float(self.board.flip_start[self.index])
+
+
+class BoardTiles(Mapping):
+    # Read-only (row, col) -> Tile mapping over the cells that are not holes
+    def __init__(self, board: "Board"):
+        self.board = board
+
+    def __getitem__(self, position: Position) -> Tile:
+        index = self.board.index(*position)
+        if index < 0:
+            raise KeyError(position)
+        return Tile(self.board, index)
+
+    def __iter__(self) -> Iterator[Position]:
+        cols = self.board.cols
+        for index in self.board.cells.tolist():
+            yield divmod(index, cols)
+
+    def __len__(self) -> int:
+        return len(self.board.cells)
+
+    def __contains__(self, position: object) -> bool:
+        return isinstance(position, tuple) and self.board.index(*position) >= 0
+
+
+class Board:
+    # Parallel arrays over rows * cols cells. Holes have color -1. Cells that
+    # are mid-flip are kept in `active`, and every cell whose look changed
+    # since the last take_changed() is kept in `changed`, so per-frame work
+    # scales with animating tiles rather than board size.
+    def __init__(self, rows: int, cols: int, holes: Sequence[Position] = (),
+                 rng: Optional[random.Random] = None, palette: Optional[List[Color]] = None,
+                 layout: Optional[Sequence[int]] = None, min_pair_distance: int = 0):
+        self.rows = rows
+        self.cols = cols
+        present = np.ones(rows * cols, dtype=bool)
+        for row, col in holes:
+            present[row * cols + col] = False
+        self.cells = np.flatnonzero(present)
+        if len(self.cells) % 2:
+            raise ValueError(f"a {rows}x{cols} board with {len(holes)} holes has an odd number of tiles")
+        self.pairs = len(self.cells) // 2
+        self.palette = palette if palette is not None else generate_palette(self.pairs)
+
+        if layout is None:
+            layout = generate_layout(self.cells.tolist(), cols, min_pair_distance, rng)
+        self.color = np.full(rows * cols, -1, dtype=np.int32)
+        self.color[self.cells] = layout
+
+        size = rows * cols
+        self.revealed = np.zeros(size, dtype=bool)
+        self.matched = np.zeros(size, dtype=bool)
+        self.flip_start = np.zeros(size, dtype=np.float64)
+        self.flip_progress = np.zeros(size, dtype=np.float32)
+        self.active: Set[int] = set()
+        self.changed: Set[int] = set()
+        self.tiles = BoardTiles(self)
+
+    @classmethod
+    def from_spec(cls, spec: LevelSpec, rng: Optional[random.Random] = None,
+                  layout: Optional[Sequence[int]] = None) -> "Board":
+        return cls(spec.rows, spec.cols, sorted(spec.holes), rng=rng, layout=layout,
+                   min_pair_distance=spec.min_pair_distance)
+
+    def index(self, row: int, col: int) -> int:
+        # O(1) lookup; -1 for anything outside the grid or in a hole
+        if 0 <= row < self.rows and 0 <= col < self.cols:
+            index = row * self.cols + col
+            if self.color[index] >= 0:
+                return index
+        return -1
+
+    def position(self, index: int) -> Position:
+        return divmod(index, self.cols)
+
+    def layout(self) -> List[int]:
+        return self.color[self.cells].tolist()
+
+    def start_flip(self, index: int, current_time: float) -> None:
+        self.flip_start[index] = current_time
+        self.flip_progress[index] = 0
+        self.active.add(index)
+        self.changed.add(index)
+
+    def update(self, current_time: float) -> None:
+        if not self.active:
+            return
+        self.changed.update(self.active)
+        # A flip ends at exactly flip_start + FLIP_DURATION, the time
+        # GameEngine.next_event_time() reports, whatever the division rounds to
+        if len(self.active) < 32:
+            # A handful of flips is cheaper element by element than through numpy
+            for index in list(self.active):
+                start = self.flip_start[index]
+                if current_time >= start + FLIP_DURATION:
+                    self.flip_progress[index] = 1
+                    self.revealed[index] = not self.revealed[index]
+                    self.active.discard(index)
+                else:
+                    self.flip_progress[index] = (current_time - start) / FLIP_DURATION
+            return
+
+        indices = np.fromiter(self.active, dtype=np.intp, count=len(self.active))
+        starts = self.flip_start[indices]
+        finished = current_time >= starts + FLIP_DURATION
+        self.flip_progress[indices] = np.where(finished, 1, (current_time - starts) / FLIP_DURATION)
+        done = indices[finished]
+        if len(done):
+            self.revealed[done] = ~self.revealed[done]
+            self.active.difference_update(done.tolist())
+
+    def face_up_unmatched(self) -> np.ndarray:
+        return np.flatnonzero(self.revealed & ~self.matched)
+
+    def take_changed(self) -> Set[int]:
+        changed = self.changed
+        self.changed = set()
+        return changed
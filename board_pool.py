@@ -0,0 +1,181 @@
+import argparse
+import random
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+from board import LevelSpec, check_spec, generate_layout
+
+
+def spec_key(spec: LevelSpec) -> str:
+    holes = ",".join(f"{r}:{c}" for r, c in sorted(spec.holes))
+    return f"{spec.rows}x{spec.cols}/{holes}/{spec.min_pair_distance}"
+
+
+class BoardPool:
+    # Keeps `depth` layouts per level spec generated ahead on a background
+    # thread, so dealing a level is a dictionary pop. The k-th layout of a
+    # spec always comes from its own seeded rng, so a seed gives the same
+    # sequence of deals however the thread's timing falls. A generation that
+    # fails is kept and raised from the take() that asks for that layout.
+    def __init__(self, specs: Iterable[LevelSpec], seed: Optional[int] = None, depth: int = 2,
+                 start: bool = True):
+        self.seed = random.randrange(1 << 63) if seed is None else seed
+        self.depth = depth
+        self.generated = 0
+        self.seconds = 0.0
+        # take() calls that found their layout not started and generated it themselves
+        self.misses = 0
+        self._specs = list(dict.fromkeys(specs))
+        for spec in self._specs:
+            check_spec(spec)
+        self._ready: Dict[LevelSpec, Dict[int, List[int]]] = {spec: {} for spec in self._specs}
+        self._failed: Dict[LevelSpec, Dict[int, Exception]] = {spec: {} for spec in self._specs}
+        # Next layout index handed out by take() and next one claimed for generation
+        self._taken = dict.fromkeys(self._specs, 0)
+        self._claimed = dict.fromkeys(self._specs, 0)
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+        if start:
+            self.start()
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._fill_loop, name="board-pool", daemon=True)
+        self._thread.start()
+
+    def generate(self, spec: LevelSpec, index: int) -> List[int]:
+        rng = random.Random(f"{self.seed}/{spec_key(spec)}/{index}")
+        return generate_layout(spec.cells(), spec.cols, spec.min_pair_distance, rng)
+
+    def _add_spec(self, spec: LevelSpec) -> None:
+        check_spec(spec)
+        self._specs.append(spec)
+        self._ready[spec] = {}
+        self._failed[spec] = {}
+        self._taken[spec] = self._claimed[spec] = 0
+
+    def _next_job(self) -> Optional[tuple]:
+        # The spec furthest behind its depth, so every level stays ready
+        behind = [(self._claimed[spec] - self._taken[spec], i) for i, spec in enumerate(self._specs)]
+        queued, i = min(behind, default=(self.depth, 0))
+        if queued >= self.depth:
+            return None
+        spec = self._specs[i]
+        self._claimed[spec] += 1
+        return spec, self._claimed[spec] - 1
+
+    def _fill_loop(self) -> None:
+        while True:
+            with self._cond:
+                job = self._next_job()
+                while job is None and not self._closed:
+                    self._cond.wait()
+                    job = self._next_job()
+                if self._closed:
+                    return
+            spec, index = job
+            began = time.perf_counter()
+            try:
+                layout = self.generate(spec, index)
+            except Exception as exc:
+                with self._cond:
+                    self._failed[spec][index] = exc
+                    self._cond.notify_all()
+                continue
+            with self._cond:
+                self.generated += 1
+                self.seconds += time.perf_counter() - began
+                self._ready[spec][index] = layout
+                self._cond.notify_all()
+
+    def take(self, spec: LevelSpec) -> List[int]:
+        with self._cond:
+            if spec not in self._ready:
+                self._add_spec(spec)
+            index = self._taken[spec]
+            self._taken[spec] += 1
+            # Wait for a layout the thread is already working on; one it has
+            # not reached yet is cheaper to generate here than to queue for
+            while (index not in self._ready[spec] and index not in self._failed[spec]
+                   and index < self._claimed[spec]):
+                self._cond.wait()
+            error = self._failed[spec].pop(index, None)
+            if error is not None:
+                self._cond.notify_all()
+                raise error
+            layout = self._ready[spec].pop(index, None)
+            if layout is None:
+                self._claimed[spec] = index + 1
+                self.misses += 1
+            self._cond.notify_all()
+        return layout if layout is not None else self.generate(spec, index)
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+
+    @property
+    def boards_per_second(self) -> float:
+        return self.generated / self.seconds if self.seconds else 0.0
+
+
+def parse_grid(value: str) -> tuple:
+    try:
+        rows, cols = (int(n) for n in value.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected ROWSxCOLS, e.g. 6x8, not {value!r}")
+    if rows < 1 or cols < 1:
+        raise argparse.ArgumentTypeError(f"a board needs at least one row and column, not {value!r}")
+    return rows, cols
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure board generation throughput")
+    parser.add_argument("--grid", type=parse_grid, default=(20, 20), help="ROWSxCOLS")
+    parser.add_argument("--holes", type=float, default=0.0,
+                        help="fraction of cells knocked out at random (seeded) to make an irregular shape")
+    parser.add_argument("--min-distance", type=int, default=2,
+                        help="minimum Manhattan distance between the tiles of a pair (2 forbids touching)")
+    parser.add_argument("--boards", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rows, cols = args.grid
+    rng = random.Random(args.seed)
+    positions = [(r, c) for r in range(rows) for c in range(cols)]
+    holes = set(rng.sample(positions, int(len(positions) * args.holes)))
+    if (len(positions) - len(holes)) % 2:
+        holes.add(next(p for p in positions if p not in holes))
+    spec = LevelSpec(rows, cols, frozenset(holes), args.min_distance)
+
+    try:
+        check_spec(spec)
+    except ValueError as exc:
+        parser.error(str(exc))
+    pool = BoardPool([spec], seed=args.seed, start=False)
+    cells = spec.cells()
+    closest = rows + cols
+    began = time.perf_counter()
+    for index in range(args.boards):
+        layout = pool.generate(spec, index)
+        first: Dict[int, int] = {}
+        for cell, color in zip(cells, layout):
+            if color in first:
+                (r1, c1), (r2, c2) = divmod(first[color], cols), divmod(cell, cols)
+                closest = min(closest, abs(r1 - r2) + abs(c1 - c2))
+            else:
+                first[color] = cell
+    elapsed = time.perf_counter() - began
+
+    print(f"{rows}x{cols} board, {len(cells)} tiles, {len(holes)} holes, min pair distance {args.min_distance}")
+    print(f"{args.boards} boards in {elapsed:.2f}s: {args.boards / elapsed:.1f} boards/s, "
+          f"{args.boards * len(cells) / elapsed:.0f} tiles/s, {elapsed / args.boards * 1000:.2f} ms per board")
+    print(f"closest pair in any board: {closest}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+import argparse
+import random
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Set
+
+from board import Position
+from engine import IGNORED, MATCH, MISMATCH, GameEngine
+from timing import ManualClock
+
+
+class BotPlayer:
+    # By default plays with perfect memory: every color it has seen is
+    # remembered, and a known pair is always cleared before another unknown
+    # tile is turned over. `memory` limits how many tiles it remembers (the
+    # least recently seen are forgotten first), `error_rate` is the chance
+    # that a recall fails and a random tile is turned instead, and
+    # `think_time` is the simulated time spent before each click. A limited
+    # memory must hold at least the two tiles turned in one turn.
+    def __init__(self, engine: GameEngine, clock: ManualClock, rng: Optional[random.Random] = None,
+                 memory: Optional[int] = None, error_rate: float = 0.0, think_time: float = 0.0):
+        if memory is not None and memory < 2:
+            raise ValueError(f"a bot must remember at least the 2 tiles of a turn, not {memory}")
+        self.engine = engine
+        self.clock = clock
+        self.rng = rng or random.Random()
+        self.memory = memory
+        self.error_rate = error_rate
+        self.think_time = think_time
+        self.clicks = 0
+        self.mismatches = 0
+        # Seen but unmatched positions, grouped by color
+        self._seen: Dict[int, Set[Position]] = {}
+        self._unknown: Set[Position] = set()
+        # Remembered positions, least recently seen first; only used with limited memory
+        self._recent: "OrderedDict[Position, int]" = OrderedDict()
+
+    def _settle(self) -> None:
+        # Let flips and the mismatch reset finish before the next move,
+        # jumping the clock straight to each event so no time is overshot
+        while self.engine.is_animating:
+            self.engine.update(self.clock.advance_to(self.engine.next_event_time()))
+
+    def _click(self, position: Position) -> str:
+        if self.think_time:
+            self.clock.advance(self.think_time)
+        outcome = self.engine.click(*position)
+        if outcome == IGNORED:
+            return outcome
+        self.clicks += 1
+        self._unknown.discard(position)
+        self._remember(position, self.engine.tiles[position].color_index)
+        if outcome == MISMATCH:
+            self.mismatches += 1
+        return outcome
+
+    def _remember(self, position: Position, color: int) -> None:
+        self._seen.setdefault(color, set()).add(position)
+        if self.memory is None:
+            return
+        self._recent[position] = color
+        self._recent.move_to_end(position)
+        while len(self._recent) > self.memory:
+            forgotten, forgotten_color = self._recent.popitem(last=False)
+            positions = self._seen[forgotten_color]
+            positions.discard(forgotten)
+            if not positions:
+                del self._seen[forgotten_color]
+            # A forgotten tile that has since been matched is not worth turning again
+            if forgotten not in self.engine.state.matched_pairs:
+                self._unknown.add(forgotten)
+
+    def _matched(self, first: Position, second: Position) -> None:
+        # With limited memory the first tile may already be forgotten
+        self._seen.pop(self.engine.tiles[first].color_index, None)
+        for position in (first, second):
+            self._recent.pop(position, None)
+            self._unknown.discard(position)
+
+    def _recall(self, position: Optional[Position]) -> Optional[Position]:
+        if position is not None and self.error_rate and self.rng.random() < self.error_rate:
+            return None
+        return position
+
+    def _partner(self, position: Position) -> Optional[Position]:
+        for other in self._seen[self.engine.tiles[position].color_index]:
+            if other != position:
+                return other
+        return None
+
+    def _known_pair(self) -> Optional[Position]:
+        for positions in self._seen.values():
+            if len(positions) == 2:
+                return next(iter(positions))
+        return None
+
+    def _pick_unknown(self, exclude: Optional[Position] = None) -> Position:
+        candidates = self._unknown - {exclude} if exclude is not None else self._unknown
+        if not candidates:
+            # Everything left is remembered; a failed recall guesses among those
+            candidates = {p for positions in self._seen.values() for p in positions} - {exclude}
+        return self.rng.choice(sorted(candidates))
+
+    def play_turn(self) -> None:
+        first = self._recall(self._known_pair())
+        if first is None:
+            first = self._pick_unknown()
+        self._click(first)
+
+        second = self._recall(self._partner(first))
+        if second is None:
+            second = self._pick_unknown(exclude=first)
+        if self._click(second) == MATCH:
+            self._matched(first, second)
+        self._settle()
+
+    def play_level(self) -> None:
+        self._seen.clear()
+        self._recent.clear()
+        self._unknown = set(self.engine.tiles)
+        while not self.engine.level_complete:
+            self.play_turn()
+
+    def play_game(self) -> None:
+        while True:
+            self.play_level()
+            if self.engine.is_final_level:
+                self.engine.state.game_complete = True
+                return
+            self.engine.start_next_level()
+
+
+def run_games(count: int, seed: int = 0) -> float:
+    # Plays `count` complete games and returns the elapsed wall time
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    for _ in range(count):
+        clock = ManualClock()
+        engine = GameEngine(clock=clock, rng=random.Random(rng.random()))
+        BotPlayer(engine, clock, rng).play_game()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure headless engine throughput with a bot player")
+    parser.add_argument("--games", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    elapsed = run_games(args.games, args.seed)
+    print(f"{args.games} games in {elapsed:.2f}s ({args.games / elapsed:.0f} games/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+import pygame
+
+
+class DirtyRectTracker:
+    # Items report their footprint and a content token every frame; any change
+    # in either marks both the old and the new area dirty. Dirty rects are
+    # merged on a grid of `cell`-pixel squares. collect() returns None when a
+    # full redraw is cheaper than patching: more than max_dirty rects were
+    # marked, or the merged area covers over full_redraw_ratio of the screen.
+    def __init__(self, screen_size: Tuple[int, int], full_redraw_ratio: float = 0.5, max_dirty: int = 128,
+                 cell: int = 32):
+        self.screen_size = screen_size
+        self.full_redraw_ratio = full_redraw_ratio
+        self.max_dirty = max_dirty
+        self.cell = cell
+        self._items: Dict[Hashable, Tuple[pygame.Rect, Any]] = {}
+        self._dirty: List[pygame.Rect] = []
+        self._full = True
+
+    def invalidate(self, screen_size: Optional[Tuple[int, int]] = None) -> None:
+        if screen_size is not None:
+            self.screen_size = screen_size
+        self._items.clear()
+        self._dirty.clear()
+        self._full = True
+
+    def mark(self, rect: pygame.Rect) -> None:
+        if rect.width > 0 and rect.height > 0:
+            self._dirty.append(pygame.Rect(rect))
+
+    def track(self, key: Hashable, rect: pygame.Rect, token: Any = None) -> None:
+        previous = self._items.get(key)
+        if previous is not None:
+            old_rect, old_token = previous
+            if old_rect == rect and old_token == token:
+                return
+            self.mark(old_rect)
+        self.mark(rect)
+        self._items[key] = (pygame.Rect(rect), token)
+
+    def forget(self, key: Hashable) -> None:
+        previous = self._items.pop(key, None)
+        if previous is not None:
+            self.mark(previous[0])
+
+    def merge(self, rects: List[pygame.Rect]) -> List[pygame.Rect]:
+        # Marks the grid cells each rect touches, joins marked cells into runs
+        # along each row and extends a run down while the rows below repeat it.
+        # Linear in rects and cells, where merging rect against rect was
+        # quadratic in the rects.
+        cell = self.cell
+        screen_rect = pygame.Rect((0, 0), self.screen_size)
+        rows, cols = -(-screen_rect.height // cell), -(-screen_rect.width // cell)
+        # Padded by an unmarked column either side, so every run has both edges
+        covered = np.zeros((rows, cols + 2), dtype=bool)
+        for rect in rects:
+            rect = rect.clip(screen_rect)
+            if rect.width > 0 and rect.height > 0:
+                covered[rect.top // cell:(rect.bottom - 1) // cell + 1,
+                        rect.left // cell + 1:(rect.right - 1) // cell + 2] = True
+        # Edges come out row by row, left to right: a run's start, then its end
+        edge_rows, edge_cols = np.nonzero(covered[:, 1:] != covered[:, :-1])
+        merged: List[pygame.Rect] = []
+        above: Dict[Tuple[int, int], pygame.Rect] = {}
+        current: Dict[Tuple[int, int], pygame.Rect] = {}
+        current_row = -1
+        for row, start, stop in zip(edge_rows[::2].tolist(), edge_cols[::2].tolist(), edge_cols[1::2].tolist()):
+            if row != current_row:
+                above = current if row == current_row + 1 else {}
+                current, current_row = {}, row
+            rect = above.get((start, stop))
+            if rect is None:
+                rect = pygame.Rect(start * cell, row * cell, (stop - start) * cell, 0)
+                merged.append(rect)
+            rect.height += cell
+            current[(start, stop)] = rect
+        return [rect.clip(screen_rect) for rect in merged]
+
+    def collect(self) -> Optional[List[pygame.Rect]]:
+        full = self._full
+        dirty = self._dirty
+        self._full = False
+        self._dirty = []
+        if full or len(dirty) > self.max_dirty:
+            return None
+
+        rects = self.merge(dirty)
+        area = sum(r.width * r.height for r in rects)
+        if area > self.full_redraw_ratio * self.screen_size[0] * self.screen_size[1]:
+            return None
+        return rects
+
+    @staticmethod
+    def present(rects: Optional[List[pygame.Rect]]) -> None:
+        if rects is None:
+            pygame.display.flip()
+        elif rects:
+            pygame.display.update(rects)
@@ -0,0 +1,173 @@
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional, Sequence, Set, Tuple
+
+from board import FLIP_DURATION, Board, BoardTiles, LevelSpec, check_spec
+from board_pool import BoardPool
+from timing import TimerQueue
+
+# Outcomes reported by GameEngine.click
+IGNORED = "ignored"
+SELECTED = "selected"
+MATCH = "match"
+MISMATCH = "mismatch"
+
+
+@dataclass
+class GameState:
+    level: int = 1
+    score: int = 0
+    matches_found: int = 0
+    selected_tile: Optional[Tuple[int, int]] = None
+    game_time: float = 0
+    message: str = "Little Scientists: Matching Adventure Quest!"
+    matched_pairs: Set[Tuple[int, int]] = field(default_factory=set)
+    game_complete: bool = False
+    game_active: bool = False
+
+
+class GameEngine:
+    # Level 1: 4x4 grid (8 pairs needed)
+    # Level 2: 5x5 grid with the center tile skipped to create a donut shape (12 pairs needed)
+    # No pair is dealt side by side, which evens out level difficulty
+    LEVELS = {
+        1: LevelSpec(4, 4, min_pair_distance=2),
+        2: LevelSpec(5, 5, frozenset({(2, 2)}), min_pair_distance=2),
+    }
+
+    SCIENCE_MESSAGES = [
+        "Excellent observation!",
+        "Data match found!",
+        "Scientific success!",
+        "Discovery made!",
+    ]
+
+    RESET_DELAY = 1.0
+
+    # Game rules without any display: tiles are addressed by (row, col) and
+    # time comes from the injected clock unless a caller passes it explicitly.
+    # `layouts` deals fixed colors (in Board.layout() order) for some levels
+    # instead of shuffling, e.g. to replay a recorded session. Other levels
+    # are dealt from `pool` when one is given, else generated on the spot.
+    def __init__(self, clock: Callable[[], float] = time.time, rng: Optional[random.Random] = None,
+                 levels: Optional[Dict[int, LevelSpec]] = None, setup: bool = True,
+                 layouts: Optional[Dict[int, Sequence[int]]] = None, pool: Optional[BoardPool] = None):
+        self.clock = clock
+        self.rng = rng or random.Random()
+        self.levels = levels or self.LEVELS
+        for spec in self.levels.values():
+            check_spec(spec)
+        self.layouts = layouts if layouts is not None else {}
+        self.pool = pool
+        self.state = GameState(level=min(self.levels))
+        self.board: Optional[Board] = None
+        self.waiting_for_reset = False
+        self.reset_start_time = 0.0
+        self.timers = TimerQueue()
+        if setup:
+            self.setup_level()
+
+    def setup_level(self) -> None:
+        level = self.state.level
+        spec = self.levels[level]
+        layout = self.layouts.get(level)
+        if layout is None and self.pool is not None:
+            layout = self.pool.take(spec)
+        self.board = Board.from_spec(spec, self.rng, layout)
+        self.timers.clear()
+        self.waiting_for_reset = False
+
+    @property
+    def tiles(self) -> BoardTiles:
+        return self.board.tiles
+
+    @property
+    def rows(self) -> int:
+        return self.board.rows
+
+    @property
+    def cols(self) -> int:
+        return self.board.cols
+
+    @property
+    def required_matches(self) -> int:
+        return self.board.pairs
+
+    @property
+    def level_complete(self) -> bool:
+        return self.state.matches_found == self.required_matches
+
+    @property
+    def is_final_level(self) -> bool:
+        return self.state.level >= max(self.levels)
+
+    def start_next_level(self) -> None:
+        self.state.level += 1
+        self.state.matches_found = 0
+        self.state.matched_pairs.clear()
+        self.state.selected_tile = None
+        self.state.message = f"Starting Level {self.state.level}! More complex level ahead!"
+        self.setup_level()
+
+    def click(self, row: int, col: int, current_time: Optional[float] = None) -> str:
+        if self.waiting_for_reset:
+            return IGNORED
+
+        board = self.board
+        index = board.index(row, col)
+        if index < 0 or board.revealed[index] or index in board.active or board.matched[index]:
+            return IGNORED
+
+        if current_time is None:
+            current_time = self.clock()
+        board.start_flip(index, current_time)
+
+        if not self.state.selected_tile:
+            self.state.selected_tile = (row, col)
+            return SELECTED
+
+        prev_row, prev_col = self.state.selected_tile
+        prev_index = board.index(prev_row, prev_col)
+        self.state.selected_tile = None
+
+        if board.color[index] == board.color[prev_index]:
+            board.matched[index] = board.matched[prev_index] = True
+            self.state.matched_pairs.update([(prev_row, prev_col), (row, col)])
+            self.state.matches_found += 1
+            self.state.score += 10 * self.state.level
+            self.state.message = self.rng.choice(self.SCIENCE_MESSAGES)
+            return MATCH
+
+        self.waiting_for_reset = True
+        self.reset_start_time = current_time
+        reset_time = current_time + self.RESET_DELAY
+        self.timers.schedule(reset_time, lambda: self._flip_back(reset_time))
+        return MISMATCH
+
+    def _flip_back(self, current_time: float) -> None:
+        for index in self.board.face_up_unmatched().tolist():
+            self.board.start_flip(index, current_time)
+        self.waiting_for_reset = False
+
+    def update(self, current_time: Optional[float] = None) -> None:
+        if current_time is None:
+            current_time = self.clock()
+
+        # Only tiles that are mid-flip need work. Flips finish before timers
+        # fire so a mismatched pair is revealed before it turns back.
+        self.board.update(current_time)
+        self.timers.run_due(current_time)
+
+    def next_event_time(self) -> float:
+        # When update() next has work to do: the earliest flip to finish or
+        # timer to fire; infinity while nothing is pending
+        due = self.timers.next_due()
+        if self.board.active:
+            starts = self.board.flip_start[list(self.board.active)]
+            due = min(due, float(starts.min()) + FLIP_DURATION)
+        return due
+
+    @property
+    def is_animating(self) -> bool:
+        return bool(self.board.active) or self.waiting_for_reset
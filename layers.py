@@ -0,0 +1,44 @@
+from typing import Callable, Dict, Optional
+
+import pygame
+
+COLORKEY = (255, 0, 255)
+
+
+def new_layer(size, transparent: bool = False) -> pygame.Surface:
+    # Offscreen surfaces are converted to the display format so blitting them
+    # never needs a per-pixel conversion; transparent layers use a colorkey
+    surface = pygame.Surface(size)
+    if pygame.display.get_surface() is not None:
+        surface = surface.convert()
+    if transparent:
+        surface.fill(COLORKEY)
+        surface.set_colorkey(COLORKEY)
+    return surface
+
+
+class LayerCache:
+    # Named pre-rendered layers. Each is rendered on first use and kept until
+    # invalidate(), which the game calls on screen mode and level changes.
+    def __init__(self):
+        self._layers: Dict[str, pygame.Surface] = {}
+        self.renders = 0
+
+    def get(self, name: str, render: Callable[[], pygame.Surface]) -> pygame.Surface:
+        layer = self._layers.get(name)
+        if layer is None:
+            layer = self._layers[name] = render()
+            self.renders += 1
+        return layer
+
+    def peek(self, name: str) -> Optional[pygame.Surface]:
+        return self._layers.get(name)
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        if name is None:
+            self._layers.clear()
+        else:
+            self._layers.pop(name, None)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._layers
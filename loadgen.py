@@ -0,0 +1,165 @@
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional, Set
+
+import numpy as np
+
+from engine import MISMATCH, SELECTED
+from server import DEFAULT_PORT
+
+
+class LoadStats:
+    def __init__(self):
+        self.connected = 0
+        self.clicks = 0
+        self.games = 0
+        self.errors = 0
+        self.latencies: List[float] = []
+
+
+class LoadClient:
+    # A student stand-in: remembers every face it has been shown, clears a
+    # known pair when it has one and otherwise turns a random unseen tile,
+    # pausing `think` seconds (jittered) between clicks
+    def __init__(self, host: str, port: int, stats: LoadStats, think: float, rng: random.Random):
+        self.host = host
+        self.port = port
+        self.stats = stats
+        self.think = think
+        self.rng = rng
+        self.cols = 1
+        self.hidden: Set[int] = set()
+        self.faces: Dict[int, int] = {}
+        self.first: Optional[int] = None
+        self.sent: List[float] = []
+        self.waiting = 0.0
+        self.complete = False
+
+    def _on_message(self, message: dict) -> None:
+        if message["type"] == "level":
+            self.cols = message["cols"]
+            holes = set(message["holes"])
+            self.hidden = {i for i in range(message["rows"] * self.cols) if i not in holes}
+            self.faces.clear()
+            self.first = None
+            self.complete = False
+            return
+        now = time.perf_counter()
+        for _, _, outcome in message["outcomes"]:
+            if self.sent:
+                self.stats.latencies.append(now - self.sent.pop(0))
+            if outcome == MISMATCH:
+                # Wait out the reset before clicking again
+                self.waiting = now + 1.4
+            if outcome != SELECTED:
+                self.first = None
+        for index, face, matched in message["cells"]:
+            if matched:
+                self.hidden.discard(index)
+            elif face >= 0:
+                self.faces[index] = face
+        self.complete = message["complete"]
+
+    def _pick(self) -> int:
+        # The partner of the first tile if known, else a known pair, else an unseen tile
+        by_face: Dict[int, List[int]] = {}
+        for index, face in self.faces.items():
+            if index in self.hidden and index != self.first:
+                by_face.setdefault(face, []).append(index)
+        if self.first is not None:
+            partners = by_face.get(self.faces.get(self.first, -1))
+            if partners:
+                return partners[0]
+        else:
+            for indices in by_face.values():
+                if len(indices) == 2:
+                    return indices[0]
+        unseen = [i for i in self.hidden if i not in self.faces and i != self.first]
+        return self.rng.choice(unseen or [i for i in self.hidden if i != self.first])
+
+    async def _read(self, reader: asyncio.StreamReader) -> None:
+        while True:
+            line = await reader.readline()
+            if not line:
+                return
+            self._on_message(json.loads(line))
+
+    async def run(self, duration: float) -> None:
+        try:
+            reader, writer = await asyncio.open_connection(self.host, self.port)
+        except OSError:
+            self.stats.errors += 1
+            return
+        self.stats.connected += 1
+        reading = asyncio.create_task(self._read(reader))
+        end = time.perf_counter() + duration
+        try:
+            await asyncio.sleep(self.rng.uniform(0, self.think))
+            while time.perf_counter() < end and not reading.done():
+                await asyncio.sleep(self.think * self.rng.uniform(0.5, 1.5))
+                if self.complete:
+                    self.stats.games += 1
+                    self.complete = False
+                    writer.write(b'{"op": "new"}\n')
+                    continue
+                if time.perf_counter() < self.waiting or len(self.hidden) < 2:
+                    continue
+                index = self._pick()
+                self.first = index if self.first is None else None
+                row, col = divmod(index, self.cols)
+                self.sent.append(time.perf_counter())
+                writer.write(json.dumps({"op": "click", "row": row, "col": col}).encode() + b"\n")
+                self.stats.clicks += 1
+        finally:
+            reading.cancel()
+            writer.close()
+
+
+async def run_load(host: str, port: int, sessions: int, duration: float, think: float, seed: int) -> LoadStats:
+    stats = LoadStats()
+    rng = random.Random(seed)
+    clients = [LoadClient(host, port, stats, think, random.Random(rng.random())) for _ in range(sessions)]
+    await asyncio.gather(*(client.run(duration) for client in clients))
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Drive the classroom server with simulated students over loopback")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds of clicking per client")
+    parser.add_argument("--think", type=float, default=0.5, help="mean seconds between a client's clicks")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--spawn-server", action="store_true",
+                        help="start server.py in a child process for the duration of the run")
+    args = parser.parse_args()
+
+    server = None
+    if args.spawn_server:
+        server = subprocess.Popen([sys.executable, "server.py", "--port", str(args.port), "--stats", "5"],
+                                  cwd=sys.path[0] or ".")
+        time.sleep(1.0)
+    try:
+        start = time.perf_counter()
+        stats = asyncio.run(run_load(args.host, args.port, args.sessions, args.duration, args.think, args.seed))
+        wall = time.perf_counter() - start
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    print(f"{stats.connected}/{args.sessions} sessions connected, {stats.errors} failed")
+    print(f"{stats.clicks} clicks in {wall:.1f}s ({stats.clicks / wall:.0f}/s), {stats.games} games completed")
+    if stats.latencies:
+        p50, p95, p99 = np.percentile(np.array(stats.latencies) * 1000, (50, 95, 99))
+        print(f"click-to-diff latency p50 {p50:.1f} ms, p95 {p95:.1f} ms, p99 {p99:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,47 +1,30 @@
-import pygame
-import random
 import time
-import math
-from dataclasses import dataclass, field
-from typing import Tuple, Optional, Set, List, Dict
-
-@dataclass
-class GameState:
-    level: int = 1
-    score: int = 0
-    matches_found: int = 0
-    selected_tile: Optional[Tuple[int, int]] = None
-    game_time: float = 0
-    message: str = "Little Scientists: Matching Adventure Quest!"
-    matched_pairs: Set[Tuple[int, int]] = field(default_factory=set)
-    game_complete: bool = False
-    game_active: bool = False
-
-class Tile:
-    def __init__(self, color: Tuple[int, int, int], rect: pygame.Rect):
-        self.color = color
-        self.rect = rect
-        self.flip_progress = 0
-        self.is_flipping = False
-        self.revealed = False
-        self.flip_start_time = 0
-        self.matched = False
-        self.flip_duration = 0.3
-
-    def update_flip(self, current_time: float) -> bool:
-        if self.is_flipping:
-            progress = min((current_time - self.flip_start_time) / self.flip_duration, 1)
-            self.flip_progress = progress
-            if progress >= 1:
-                self.is_flipping = False
-                self.revealed = not self.revealed
-                return True
-        return False
-
-    def start_flip(self, current_time: float) -> None:
-        self.is_flipping = True
-        self.flip_start_time = current_time
+_MODULE_START = time.perf_counter()
 
+import argparse
+import math
+import numpy as np
+import pygame
+import random
+from typing import Callable, Dict, Tuple, Optional, List, Set
+
+from animation import Timeline, ease_in_out, ease_out_cubic
+from assets import AssetLoader, SpriteAtlas
+from audio import AudioSystem
+from board import Board, BoardTiles, LevelSpec, Position, Tile, check_spec
+from board_pool import BoardPool, parse_grid
+from dirty_rects import DirtyRectTracker
+from engine import IGNORED, MATCH, MISMATCH, SELECTED, GameEngine, GameState
+from layers import COLORKEY, LayerCache, new_layer
+from particles import ParticleField
+from profiling import FrameProfiler, StartupProfiler
+from recording import SessionRecorder
+from text_cache import fonts, text_cache
+from tile_sprites import TileSpriteCache
+from timing import FixedTimestep, ScaledClock, TimerQueue
+
+STARTUP = StartupProfiler(_MODULE_START)
+STARTUP.mark("import")
 
 # new button feature
 class Button:
@@ -50,14 +33,14 @@ class Button:
         self.rect = rect
         self.color = color
         self.hover_color = hover_color
-        self.font = pygame.font.Font(None, 48)  # Increased default font size
+        self.font = fonts.get(None, 48)  # Increased default font size
         self.is_hovered = False
 
     def draw(self, screen: pygame.Surface) -> None:
         self.is_hovered = self.rect.collidepoint(pygame.mouse.get_pos())
         color = self.hover_color if self.is_hovered else self.color
         pygame.draw.rect(screen, color, self.rect)
-        text_surface = self.font.render(self.text, True, (255, 255, 255))
+        text_surface = text_cache.render(self.text, self.font, (255, 255, 255))
         text_rect = text_surface.get_rect(center=self.rect.center)
         screen.blit(text_surface, text_rect)
 
@@ -65,74 +48,91 @@ class Button:
         return self.rect.collidepoint(pos)
 
 class ScienceGame:
-    # Level 1: 4x4 grid (8 pairs needed)
-    # Level 2: 5x5 grid (12 pairs needed)
-    COLORS = {
-        1: [  # Level 1 colors (8 pairs)
-            (230, 25, 75),    # Red
-            (60, 180, 75),    # Green
-            (255, 225, 25),   # Yellow
-            (0, 130, 200),    # Blue
-            (245, 130, 48),   # Orange
-            (145, 30, 180),   # Purple
-            (70, 240, 240),   # Cyan
-            (240, 50, 230),   # Magenta
-        ],
-        2: [  # Level 2 colors (12 pairs)
-            (230, 25, 75),    # Red
-            (60, 180, 75),    # Green
-            (255, 225, 25),   # Yellow
-            (0, 130, 200),    # Blue
-            (245, 130, 48),   # Orange
-            (145, 30, 180),   # Purple
-            (70, 240, 240),   # Cyan
-            (240, 50, 230),   # Magenta
-            (210, 245, 60),   # Lime
-            (250, 190, 212),  # Pink
-            (0, 128, 128),    # Teal
-            (220, 190, 255),  # Lavender
-        ]
-    }
-
-    SCIENCE_MESSAGES = [
-        "Excellent observation!",
-        "Data match found!",
-        "Scientific success!",
-        "Discovery made!",
-    ]
-
-    def __init__(self):
-        pygame.init()
+    # Everything outside the board is laid out in units of this design
+    # resolution, scaled uniformly to the screen
+    DESIGN_SIZE = (800, 600)
+    COUNTDOWN_SECONDS = 3
+    TRANSITION_SECONDS = 2
+    TRANSITION_FADE_SECONDS = 0.4
+    MAX_IDLE_SECONDS = 0.5
+
+    def __init__(self, dirty_rects: bool = False, particle_count: int = 50,
+                 clock: Callable[[], float] = time.perf_counter, seed: Optional[int] = None,
+                 logic_hz: int = 120, levels: Optional[Dict[int, LevelSpec]] = None,
+                 music: bool = True, profile: bool = False, power_save: bool = False,
+                 idle_particle_fps: float = 0.0, recorder: Optional[SessionRecorder] = None,
+                 sound: bool = True):
+        # Only what the start screen needs; the mixer starts after the first
+        # frame and the board is dealt when the countdown begins
+        self.audio = AudioSystem(enabled=sound)
+        # perf_counter() when the input being handled was read, for audio latency
+        self.input_time: Optional[float] = None
+        pygame.display.init()
+        pygame.font.init()
+        self.startup = STARTUP
         self.fullscreen = True
         self.screen = self.set_screen_mode()
         pygame.display.set_caption("Science Matching Game")
+
+        # Icons decode in the background; the board uses them once they arrive
+        self.assets = AssetLoader()
+        self.assets.start()
+        self.atlas: Optional[SpriteAtlas] = None
+        self.music_requested = not music
         
-        self.font = pygame.font.Font(None, 36)
-        self.title_font = pygame.font.Font(None, 48)
-        
-        self.state = GameState()
-        self.tiles: Dict[Tuple[int, int], Tile] = {}
-        self.particles = self._create_particles()
+        # Logic advances in fixed steps of simulation time read from `clock`;
+        # all delays are timers on that timeline, never sleeps
+        self.clock = clock
+        self.timestep = FixedTimestep(1 / logic_hz)
+        self.timers = TimerQueue()
+        # Presentation-only animations, advanced on the same simulation clock
+        self.timeline = Timeline()
+        self.running = False
+
+        # In power-save mode the loop blocks on input while nothing animates;
+        # particles then drift at idle_particle_fps, or freeze at 0
+        self.power_save = power_save
+        self.idle_particle_fps = idle_particle_fps
+
+        # All game rules live in the engine; this class only draws and routes input.
+        # Deals come from a pool generated ahead on a background thread, so
+        # moving to the next level never waits on a large or tightly constrained board.
+        self.board_pool = BoardPool((levels or GameEngine.LEVELS).values(), seed=seed)
+        self.engine = GameEngine(clock=lambda: self.timestep.time, rng=random.Random(seed), levels=levels,
+                                 setup=False, pool=self.board_pool)
+        self.board_ready = False
+        self.tile_sprites: Optional[TileSpriteCache] = None
+        self.layers = LayerCache()
+        self.dirty_rendering = dirty_rects
+        self.dirty_tracker = DirtyRectTracker(self.screen.get_size())
+        self.particles = ParticleField(self.screen.get_size(), particle_count, seed=seed)
         
-        self.waiting_for_reset = False
-        self.reset_start_time = 0
         self.transition_active = False
         self.transition_start_time = 0
+        self.transition_text: Optional[Tuple[str, str]] = None
+        self.transition_drawn = False
+        self.transition_fade = 0.0
+        self._transition_overlay: Optional[pygame.Surface] = None
         self.background_color = (20, 30, 40)
         
-        screen_center_x = self.screen.get_width() // 2
-        self.start_button = Button("Start", pygame.Rect(screen_center_x - 100, 400, 200, 50), 
-                                 (0, 200, 0), (0, 255, 0))
-        self.quit_button = Button("Quit", pygame.Rect(screen_center_x - 100, 470, 200, 50), 
-                                 (200, 0, 0), (255, 0, 0))
-        self.exit_button = Button("X", 
-                                pygame.Rect(self.screen.get_width() - 50, 10, 40, 40),
-                                (200, 0, 0),
-                                (255, 0, 0))
+        self.start_button = Button("Start", pygame.Rect(0, 0, 0, 0), (0, 200, 0), (0, 255, 0))
+        self.quit_button = Button("Quit", pygame.Rect(0, 0, 0, 0), (200, 0, 0), (255, 0, 0))
+        self.exit_button = Button("X", pygame.Rect(0, 0, 0, 0), (200, 0, 0), (255, 0, 0))
+        self.layout_ui()
+        self.relayout_ms = 0.0
         
         self.game_started = False
         self.countdown_start = 0
-        self.setup_level()
+        self.play_start = 0
+        self.exit_after_first_frame = False
+
+        # Frame phase timings; F3 shows them and turns recording on
+        self.profiler = FrameProfiler(enabled=profile)
+        self.recorder = recorder
+        self.show_profile = False
+        self._profile_overlay: Optional[pygame.Surface] = None
+        self._profile_overlay_frame = -1
+        self.startup.mark("init")
 
     def set_screen_mode(self) -> pygame.Surface:
         if self.fullscreen:
@@ -140,173 +140,206 @@ class ScienceGame:
         else:
             return pygame.display.set_mode((800, 600))
 
-    def _create_particles(self) -> List[List[float]]:
-        width, height = self.screen.get_width(), self.screen.get_height()
-        return [[random.randint(0, width), 
-                 random.randint(0, height),
-                 random.uniform(-0.5, 0.5),
-                 random.uniform(-0.5, 0.5),
-                 random.randint(150, 255),
-                 random.randint(2, 5)]
-                for _ in range(50)]
-
  # new level set up
 
+    @property
+    def state(self) -> GameState:
+        return self.engine.state
+
+    @property
+    def board(self) -> Board:
+        return self.engine.board
+
+    @property
+    def tiles(self) -> BoardTiles:
+        return self.engine.tiles
+
+    @property
+    def waiting_for_reset(self) -> bool:
+        return self.engine.waiting_for_reset
+
+    def units(self, value: float) -> int:
+        # Design units to screen pixels
+        return max(round(value * self.ui_scale), 1)
+
+    def layout_ui(self) -> None:
+        width, height = self.screen.get_size()
+        self.ui_scale = min(width / self.DESIGN_SIZE[0], height / self.DESIGN_SIZE[1])
+        u = self.units
+        self.font = fonts.get(None, u(36))
+        self.title_font = fonts.get(None, u(48))
+        self.header_height = u(120)
+
+        center_x = width // 2
+        self.start_button.rect = pygame.Rect(center_x - u(100), u(400), u(200), u(50))
+        self.quit_button.rect = pygame.Rect(center_x - u(100), u(470), u(200), u(50))
+        # The exit button is smaller on the start screen than in the game header
+        self.exit_button.rect = pygame.Rect(width - u(50), u(10), u(40), u(40))
+        self.hud_exit_rect = pygame.Rect(width - u(80), u(20), u(60), u(60))
+        for button in (self.start_button, self.quit_button, self.exit_button):
+            button.font = fonts.get(None, u(48))
+
+    def relayout(self) -> None:
+        # After a screen mode change only geometry and cached surfaces are
+        # rebuilt; the game state and the current deal are kept
+        start = time.perf_counter()
+        size = self.screen.get_size()
+        self.layout_ui()
+        self.particles.resize(size)
+        self.layers.invalidate()
+        self.dirty_tracker.invalidate(size)
+        self._profile_overlay = None
+        self._transition_overlay = None
+        if self.board_ready:
+            # Sprites at the new size are rendered as they are first drawn
+            self.layout_board(prebuild=False)
+        self.transition_drawn = False
+        self.relayout_ms = (time.perf_counter() - start) * 1000
+
     def setup_level(self) -> None:
-        self.grid_size = 4 if self.state.level == 1 else 5
-        
+        self.engine.setup_level()
+        self.board_ready = True
+        self.layout_board()
+        self._record_level()
+
+    def _record_level(self) -> None:
+        if self.recorder is not None:
+            self.recorder.level(self.state.level, self.board, self.timestep.time)
+
+    def layout_board(self, prebuild: bool = True) -> None:
+        rows, cols = self.engine.rows, self.engine.cols
+
         # Calculate tile size based on screen dimensions
         screen_width = self.screen.get_width()
         screen_height = self.screen.get_height()
         
         # Use the smaller screen dimension to ensure squares fit
-        usable_height = screen_height - 200  # Account for UI elements (top and bottom margins)
-        max_tile_width = screen_width // (self.grid_size + 1)  # Add padding
-        max_tile_height = usable_height // (self.grid_size + 1)
+        usable_height = screen_height - self.units(200)  # Account for UI elements (top and bottom margins)
+        max_tile_width = screen_width // (cols + 1)  # Add padding
+        max_tile_height = usable_height // (rows + 1)
         
         # Use the smaller of the two to maintain square tiles
-        self.tile_size = min(max_tile_width, max_tile_height)
+        self.tile_size = max(min(max_tile_width, max_tile_height), 2)
+        self.tile_gap = min(10, self.tile_size // 8)  # 10px on normal boards, thinner on huge ones
         
         # Calculate margins to center the grid
-        self.margin_x = (screen_width - (self.grid_size * self.tile_size)) // 2
-        self.margin_y = ((screen_height - (self.grid_size * self.tile_size)) // 2) + 80  # Increased offset for larger header
-        
-        # Get colors for current level
-        colors = self.COLORS[self.state.level]
-        
-        if self.state.level == 1:
-            needed_pairs = (self.grid_size * self.grid_size) // 2
-            color_pairs = []
-            for i in range(needed_pairs):
-                color_pairs.extend([colors[i], colors[i]])
-        else:
-            color_pairs = []
-            for i in range(12):
-                color_pairs.extend([colors[i], colors[i]])
-        
-        random.shuffle(color_pairs)
-        
-        # Create tiles with new positioning
-        self.tiles.clear()
-        color_index = 0
-        
-        for row in range(self.grid_size):
-            for col in range(self.grid_size):
-                # Skip the center tile in level 2 to create donut shape
-                if self.state.level == 2 and row == 2 and col == 2:
-                    continue
-                    
-                rect = pygame.Rect(
-                    self.margin_x + col * self.tile_size,
-                    self.margin_y + row * self.tile_size,
-                    self.tile_size - 10,
-                    self.tile_size - 10
-                )
-                self.tiles[(row, col)] = Tile(color_pairs[color_index], rect)
-                color_index += 1
+        self.margin_x = (screen_width - (cols * self.tile_size)) // 2
+        self.margin_y = ((screen_height - (rows * self.tile_size)) // 2) + self.units(80)  # Offset for the header
+
+        # Sprites depend only on tile size, so rebuild them when it changes
+        sprite_size = (self.tile_size - self.tile_gap, self.tile_size - self.tile_gap)
+        if self.tile_sprites is None or self.tile_sprites.size != sprite_size:
+            self.tile_sprites = TileSpriteCache(sprite_size)
+        self._apply_icons(prebuild)
+        self.board.take_changed()
+
+        # Static layers depend on the screen size and the board shape
+        self.layers.invalidate()
+        self.dirty_tracker.invalidate(self.screen.get_size())
+
+    def _apply_icons(self, prebuild: bool = True) -> None:
+        # Element icon i goes on the tiles of palette color i
+        if self.atlas is not None:
+            icons = self.atlas.scaled(self.tile_sprites.icon_size)
+            self.tile_sprites.set_icons({color: icons[i % len(icons)] for i, color in enumerate(self.board.palette)})
+        if prebuild and len(self.board.palette) <= 64:
+            self.tile_sprites.prebuild(self.board.palette)
+
+        # Faces per color index, filled lazily as colors get revealed
+        self._face_table = np.empty(len(self.board.palette), dtype=object)
+        self._face_ready = np.zeros(len(self.board.palette), dtype=bool)
+
+    def poll_assets(self) -> None:
+        # Called after a frame is presented so loading never delays drawing
+        if not self.audio.started:
+            self.audio.start()
+        if not self.music_requested:
+            self.music_requested = True
+            self.assets.start_music()
+        atlas = self.assets.poll()
+        if atlas is not None:
+            self.atlas = atlas
+            # Before the deal there are no tiles yet; layout_board() applies the icons then
+            if self.board_ready:
+                self._apply_icons()
+                self.layers.invalidate("board")
+                self.dirty_tracker.invalidate()
+
+    def tile_rect(self, position: Position) -> pygame.Rect:
+        row, col = position
+        size = self.tile_size - self.tile_gap
+        return pygame.Rect(self.margin_x + col * self.tile_size, self.margin_y + row * self.tile_size, size, size)
+
+    def cell_at(self, pos: Tuple[int, int]) -> Position:
+        x, y = pos
+        return (y - self.margin_y) // self.tile_size, (x - self.margin_x) // self.tile_size
+
     def start_next_level(self) -> None:
-        self.state.level += 1
-        self.state.matches_found = 0
-        self.state.matched_pairs.clear()
-        self.state.selected_tile = None
-        self.state.message = f"Starting Level {self.state.level}! More complex level ahead!"
-        self.setup_level()
+        self.engine.start_next_level()
+        self.layout_board()
+        self._record_level()
         self.transition_active = False
         self.transition_start_time = 0
 
-    def show_transition_screen(self, text1: str, text2: str) -> None:
-        overlay = pygame.Surface(self.screen.get_size())
-        overlay.set_alpha(200)
-        overlay.fill((20, 30, 40))
+    def _set_transition_fade(self, value: float) -> None:
+        self.transition_fade = value
+
+    def _end_transition_fade(self) -> None:
+        # The overlay is gone; the next frame repaints the whole screen without it
+        self.transition_text = None
+        self.dirty_tracker.invalidate()
+
+    def show_transition_screen(self, text1: str, text2: str, fade: float = 1.0) -> None:
+        # `fade` runs from 0 (invisible) to 1 (fully shown); the messages
+        # rise into place as they fade in
+        if self._transition_overlay is None:
+            self._transition_overlay = new_layer(self.screen.get_size())
+            self._transition_overlay.fill((20, 30, 40))
+        overlay = self._transition_overlay
+        overlay.set_alpha(round(200 * fade))
         
         msg1 = self.title_font.render(text1, True, (100, 200, 255))
         msg2 = self.font.render(text2, True, (255, 255, 255))
+        msg1.set_alpha(round(255 * fade))
+        msg2.set_alpha(round(255 * fade))
+        rise = round(self.units(30) * (1 - fade))
         
         self.screen.blit(overlay, (0, 0))
         screen_center_x = self.screen.get_width() // 2
-        self.screen.blit(msg1, (screen_center_x - msg1.get_width() // 2, 250))
-        self.screen.blit(msg2, (screen_center_x - msg2.get_width() // 2, 320))
-        pygame.display.flip()  # Make sure the transition screen is displayed
-
-    # Also replace the handle_click method
-    def handle_click(self, pos: Tuple[int, int], current_time: float) -> None:
-        if self.waiting_for_reset or self.transition_active:
-            return
-
-        x, y = pos
-        row = (y - self.margin_y) // self.tile_size
-        col = (x - self.margin_x) // self.tile_size
-        
-        # Skip if clicked position is not valid or is the center hole in level 2
-        if not (0 <= row < self.grid_size and 0 <= col < self.grid_size) or \
-           (self.state.level == 2 and row == 2 and col == 2):
-            return
-            
-        # Skip if the tile doesn't exist (center hole)
-        if (row, col) not in self.tiles:
-            return
-            
-        tile = self.tiles[(row, col)]
-        if tile.revealed or tile.is_flipping or tile.matched:
-            return
-
-        tile.start_flip(current_time)
-        
-        if not self.state.selected_tile:
-            self.state.selected_tile = (row, col)
-        else:
-            prev_row, prev_col = self.state.selected_tile
-            prev_tile = self.tiles[(prev_row, prev_col)]
-            
-            if tile.color == prev_tile.color:
-                tile.matched = prev_tile.matched = True
-                self.state.matched_pairs.update([(prev_row, prev_col), (row, col)])
-                self.state.matches_found += 1
-                self.state.score += 10 * self.state.level
-                self.state.message = random.choice(self.SCIENCE_MESSAGES)
-            else:
-                self.waiting_for_reset = True
-                self.reset_start_time = current_time
-            
-            self.state.selected_tile = None
+        self.screen.blit(msg1, (screen_center_x - msg1.get_width() // 2, self.units(250) + rise))
+        self.screen.blit(msg2, (screen_center_x - msg2.get_width() // 2, self.units(320) + rise))
+
+    def handle_click(self, pos: Tuple[int, int], current_time: float) -> str:
+        if self.transition_active:
+            return IGNORED
+
+        # Clicks outside the grid or on a hole are ignored by the engine
+        cell = self.cell_at(pos)
+        outcome = self.engine.click(*cell, current_time)
+        if self.recorder is not None:
+            self.recorder.click(self.state.level, cell, outcome, current_time)
+        if outcome != IGNORED:
+            self.play_outcome_sound(outcome)
+        return outcome
+
+    def play_outcome_sound(self, outcome: str) -> None:
+        # Queued while handling the click, so it reaches the mixer before this frame is drawn
+        if outcome == MATCH:
+            self.audio.play("level" if self.engine.level_complete else "match", self.input_time)
+        elif outcome == MISMATCH:
+            self.audio.play("mismatch", self.input_time)
+        elif outcome == SELECTED:
+            self.audio.play("flip", self.input_time)
 
     def update_tiles(self, current_time: float) -> None:
-        if self.waiting_for_reset and current_time - self.reset_start_time > 1:
-            for tile in self.tiles.values():
-                if tile.revealed and not tile.matched:
-                    tile.start_flip(current_time)
-            self.waiting_for_reset = False
-
-        for tile in self.tiles.values():
-            tile.update_flip(current_time)
-
-    def update_particles(self) -> None:
-        width, height = self.screen.get_width(), self.screen.get_height()
-        for particle in self.particles:
-            particle[0] = (particle[0] + particle[2]) % width
-            particle[1] = (particle[1] + particle[3]) % height
-            particle[4] -= 0.5
-            if particle[4] <= 0:
-                particle[0] = random.randint(0, width)
-                particle[1] = random.randint(0, height)
-                particle[4] = random.randint(150, 255)
-
-    def draw_laboratory_ui(self) -> None:
-        self.screen.fill(self.background_color)
-        
-        # Draw particles
-        for particle in self.particles:
-            pygame.draw.circle(self.screen, (int(particle[4]),) * 3, 
-                            (int(particle[0]), int(particle[1])), int(particle[5]))
+        self.engine.update(current_time)
 
-        # Create larger header area
-        header_height = 120
-        pygame.draw.rect(self.screen, (30, 40, 50), (0, 0, self.screen.get_width(), header_height))
-        pygame.draw.line(self.screen, (50, 150, 200), (0, header_height), 
-                        (self.screen.get_width(), header_height), 3)
-        
+    def update_particles(self, frames: float = 1.0) -> None:
+        self.particles.update(frames)
+
+    def _hud_layout(self, header_height: int) -> List[Tuple[pygame.Surface, Tuple[int, int]]]:
         # Create fonts for stats - reduced from 72 to 56
-        stats_font = pygame.font.Font(None, 56)
+        stats_font = fonts.get(None, self.units(56))
         
         # Define stats with spacing
         stats = [
@@ -319,185 +352,542 @@ class ScienceGame:
         total_width = 0
         stat_surfaces = []
         for text in stats:
-            surface = stats_font.render(text, True, (100, 200, 255))
+            # TIME only misses the cache when its 0.1 s readout changes
+            surface = text_cache.render(text, stats_font, (100, 200, 255))
             stat_surfaces.append(surface)
             total_width += surface.get_width()
         
         # Increased spacing between stats from 50 to 100
-        spacing = 100
+        spacing = self.units(100)
         total_width += spacing * (len(stats) - 1)
         
         # Calculate starting x position to center all stats
         start_x = (self.screen.get_width() - total_width) // 2
         current_x = start_x
         
-        # Draw centered stats
+        layout = []
         for surface in stat_surfaces:
-            self.screen.blit(surface, (current_x, header_height // 2 - surface.get_height() // 2))
+            layout.append((surface, (current_x, header_height // 2 - surface.get_height() // 2)))
             current_x += surface.get_width() + spacing
 
-        # Update exit button position and size
-        self.exit_button.rect = pygame.Rect(self.screen.get_width() - 80, 20, 60, 60)
-        self.exit_button.font = pygame.font.Font(None, 48)  # Larger font for exit button
-        self.exit_button.draw(self.screen)
-
-        # Draw message at bottom with larger font
-        message_font = pygame.font.Font(None, 48)  # Increased font size for message
-        msg_surface = message_font.render(self.state.message, True, (255, 255, 255))
-        self.screen.blit(msg_surface, 
-                        ((self.screen.get_width() - msg_surface.get_width()) // 2, 
-                        self.screen.get_height() - 60))
-
-    def draw_tile(self, tile: Tile) -> None:
-                if tile.is_flipping:
-                    scale = abs(math.cos(tile.flip_progress * math.pi))
-                    scaled_width = tile.rect.width * scale
-                    x_offset = (tile.rect.width - scaled_width) / 2
-                    scaled_rect = pygame.Rect(
-                        tile.rect.x + x_offset,
-                        tile.rect.y,
-                        scaled_width,
-                        tile.rect.height
-                    )
-                    color = tile.color if tile.flip_progress >= 0.5 else (60, 80, 100)
-                    pygame.draw.rect(self.screen, color, scaled_rect, border_radius=20)
-                    
-                    if scale > 0.1:
-                        center = scaled_rect.center
-                        if tile.flip_progress >= 0.5:
-                            for radius in (15, 30):
-                                pygame.draw.circle(self.screen, (255, 255, 255, 128), 
-                                                center, int(radius * scale), 1)
-                        else:
-                            for offset in range(0, 31, 15):
-                                pygame.draw.circle(self.screen, (100, 150, 200),
-                                                center, int(offset * scale), 1)
-                else:
-                    if tile.revealed:
-                        pygame.draw.rect(self.screen, tile.color, tile.rect, border_radius=20)
-                        for radius in (15, 30):
-                            pygame.draw.circle(self.screen, (255, 255, 255, 128), 
-                                            tile.rect.center, radius, 1)
-                    else:
-                        pygame.draw.rect(self.screen, (60, 80, 100), tile.rect, border_radius=20)
-                        pygame.draw.rect(self.screen, (80, 100, 120), tile.rect, 2, border_radius=20)
-                        for offset in range(0, 31, 15):
-                            pygame.draw.circle(self.screen, (100, 150, 200),
-                                            tile.rect.center, offset, 1)
+        # Message at bottom with larger font
+        message_font = fonts.get(None, self.units(48))  # Increased font size for message
+        msg_surface = text_cache.render(self.state.message, message_font, (255, 255, 255))
+        layout.append((msg_surface, ((self.screen.get_width() - msg_surface.get_width()) // 2,
+                                     self.screen.get_height() - self.units(60))))
+        return layout
+
+    def _render_header(self) -> pygame.Surface:
+        # Create larger header area
+        header_height = self.header_height
+        header = new_layer((self.screen.get_width(), header_height + 2))
+        header.fill((30, 40, 50))
+        pygame.draw.line(header, (50, 150, 200), (0, header_height), 
+                        (self.screen.get_width(), header_height), 3)
+        return header
+
+    def draw_laboratory_ui(self, areas: Optional[List[pygame.Rect]] = None) -> None:
+        # With areas only the parts overlapping them are redrawn (dirty-rect mode)
+        header_height = self.header_height
+        hud = self._hud_layout(header_height)
+
+        # The exit button moves into the header once the game UI is shown
+        self.exit_button.rect = self.hud_exit_rect
+
+        if areas is None:
+            self.screen.fill(self.background_color)
+            
+            # Draw particles
+            self.particles.draw(self.screen)
+            self.screen.blit(self.layers.get("header", self._render_header), (0, 0))
+            
+            # Draw centered stats and the message
+            for surface, pos in hud:
+                self.screen.blit(surface, pos)
+            self.exit_button.draw(self.screen)
+            return
+
+        particle_rects = [rect for rect, _ in self.particles.footprints()]
+        # Built once per frame; each area then blits just the particles it overlaps
+        particle_blits = self.particles.blit_list()
+        hud_rects = [surface.get_rect(topleft=pos) for surface, pos in hud]
+        for area in areas:
+            self.screen.set_clip(area)
+            self.screen.fill(self.background_color, area)
+            self.screen.blits([particle_blits[i] for i in area.collidelistall(particle_rects)], doreturn=False)
+            if area.top <= header_height + 2:
+                self.screen.blit(self.layers.get("header", self._render_header), area.topleft, area)
+            for index in area.collidelistall(hud_rects):
+                self.screen.blit(*hud[index])
+            if area.colliderect(self.exit_button.rect):
+                self.exit_button.draw(self.screen)
+        self.screen.set_clip(None)
+
+    def _tile_sprite(self, tile: Tile, rect: pygame.Rect) -> Tuple[Optional[pygame.Surface], Tuple[int, int]]:
+        if tile.is_flipping:
+            sprite = self.tile_sprites.flip_frame(tile.color, ease_in_out(tile.flip_progress))
+            if sprite is None:
+                return None, rect.topleft
+            x_offset = (rect.width - sprite.get_width()) // 2
+            return sprite, (rect.x + x_offset, rect.y)
+        return self.tile_sprites.face(tile.color if tile.revealed else None), rect.topleft
+
+    def draw_tile(self, tile: Tile, rect: pygame.Rect) -> None:
+        sprite, pos = self._tile_sprite(tile, rect)
+        if sprite is not None:
+            self.screen.blit(sprite, pos)
+
+    def _resting_blits(self, cells: np.ndarray, origin: Tuple[int, int]) -> List[Tuple[pygame.Surface, Tuple[int, int]]]:
+        # Resting tiles batched by face: the back for hidden tiles, a color face otherwise
+        board = self.board
+        revealed = board.revealed[cells]
+        colors = board.color[cells[revealed]]
+        missing = np.unique(colors[~self._face_ready[colors]])
+        for color_index in missing.tolist():
+            self._face_table[color_index] = self.tile_sprites.face(board.palette[color_index])
+        self._face_ready[missing] = True
+
+        sprites = np.empty(len(cells), dtype=object)
+        sprites[~revealed] = self.tile_sprites.face(None)
+        sprites[revealed] = self._face_table[colors]
+        rows, cols = np.divmod(cells, board.cols)
+        xs = origin[0] + cols * self.tile_size
+        ys = origin[1] + rows * self.tile_size
+        return list(zip(sprites.tolist(), zip(xs.tolist(), ys.tolist())))
+
+    def _animating_blits(self) -> List[Tuple[pygame.Surface, Tuple[int, int]]]:
+        blits = []
+        for index in self.board.active:
+            position = self.board.position(index)
+            sprite, pos = self._tile_sprite(self.board.tiles[position], self.tile_rect(position))
+            if sprite is not None:
+                blits.append((sprite, pos))
+        return blits
+
+    def _render_board_layer(self) -> pygame.Surface:
+        # Every resting tile on one colorkeyed surface; flipping cells stay
+        # transparent so the particles behind them show through
+        board = self.board
+        layer = new_layer((board.cols * self.tile_size, board.rows * self.tile_size), transparent=True)
+        cells = board.cells
+        if board.active:
+            cells = cells[~np.isin(cells, list(board.active))]
+        layer.blits(self._resting_blits(cells, (0, 0)), doreturn=False)
+        return layer
+
+    def _refresh_board_layer(self, changed: Set[int]) -> None:
+        layer = self.layers.peek("board")
+        if layer is None or not changed:
+            return
+        cells = np.fromiter(changed, dtype=np.intp, count=len(changed))
+        for index in cells.tolist():
+            row, col = self.board.position(index)
+            layer.fill(COLORKEY, (col * self.tile_size, row * self.tile_size, self.tile_size, self.tile_size))
+        if self.board.active:
+            cells = cells[~np.isin(cells, list(self.board.active))]
+        layer.blits(self._resting_blits(cells, (0, 0)), doreturn=False)
+
+    def draw_board(self, areas: Optional[List[pygame.Rect]] = None) -> None:
+        layer = self.layers.get("board", self._render_board_layer)
+        origin = (self.margin_x, self.margin_y)
+        if areas is None:
+            self.screen.blit(layer, origin)
+            self.screen.blits(self._animating_blits(), doreturn=False)
+            return
+
+        animating = self._animating_blits()
+        for area in areas:
+            self.screen.set_clip(area)
+            self.screen.blit(layer, area.topleft, area.move(-origin[0], -origin[1]))
+            self.screen.blits(animating, doreturn=False)
+        self.screen.set_clip(None)
+
+    def _track_dirty(self, changed: Set[int]) -> None:
+        tracker = self.dirty_tracker
+        # A drifting particle dirties its old and new rect every frame; past
+        # the tracker's budget the frame is a full redraw anyway, so skip the
+        # per-particle bookkeeping
+        if 2 * len(self.particles) > tracker.max_dirty:
+            tracker.invalidate()
+            return
+        for index, (rect, level) in enumerate(self.particles.footprints()):
+            tracker.track(("particle", index), rect, level)
+        for index, (surface, pos) in enumerate(self._hud_layout(self.header_height)):
+            tracker.track(("hud", index), surface.get_rect(topleft=pos), surface)
+        tracker.track("exit_button", self.exit_button.rect,
+                      self.exit_button.rect.collidepoint(pygame.mouse.get_pos()))
+        # Only tiles the board reports as changed need repainting
+        for index in changed:
+            tracker.mark(self.tile_rect(self.board.position(index)))
+
+    def draw_game_frame(self) -> None:
+        profiler = self.profiler
+        changed = self.board.take_changed()
+        with profiler.scope("board_layer"):
+            self._refresh_board_layer(changed)
+        # While the transition overlay fades out over a new level every frame is a full redraw
+        fading = self.transition_text is not None
+        if not self.dirty_rendering or fading:
+            with profiler.scope("ui"):
+                self.draw_laboratory_ui()
+            with profiler.scope("board"):
+                self.draw_board()
+            if fading:
+                self.show_transition_screen(*self.transition_text, self.transition_fade)
+                self.dirty_tracker.invalidate()
+            self.draw_profile_overlay()
+            with profiler.scope("present"):
+                pygame.display.flip()
+            return
+
+        with profiler.scope("dirty"):
+            self._track_dirty(changed)
+            rects = self.dirty_tracker.collect()
+        with profiler.scope("ui"):
+            self.draw_laboratory_ui(rects)
+        with profiler.scope("board"):
+            self.draw_board(rects)
+        overlay = self.draw_profile_overlay()
+        if overlay is not None and rects is not None:
+            rects.append(overlay)
+        with profiler.scope("present"):
+            self.dirty_tracker.present(rects)
+
+    def _render_profile_overlay(self) -> pygame.Surface:
+        # Opaque, so blitting it again over itself never changes the pixels
+        font = fonts.get(None, 24)
+        rows = [("phase", "p50", "p95", "p99")]
+        for name, values in self.profiler.percentiles().items():
+            rows.append((name, *(f"{ms:.2f}" for ms in values)))
+        line_height = font.get_linesize()
+        summary = font.render(self.profiler.summary(), True, (255, 180, 80))
+        overlay = new_layer((max(300, summary.get_width() + 16), line_height * (len(rows) + 1) + 8))
+        overlay.fill((0, 0, 0))
+        for i, row in enumerate(rows):
+            y = 4 + i * line_height
+            overlay.blit(font.render(row[0], True, (200, 200, 200)), (8, y))
+            for column, text in enumerate(row[1:]):
+                cell = font.render(text, True, (200, 200, 200))
+                overlay.blit(cell, (150 + column * 50 - cell.get_width() + 40, y))
+        overlay.blit(summary, (8, 4 + len(rows) * line_height))
+        return overlay
+
+    def draw_profile_overlay(self) -> Optional[pygame.Rect]:
+        # Returns the overlay's area when its contents changed this frame
+        if not self.show_profile:
+            return None
+        updated = None
+        position = (self.units(10), self.header_height + self.units(10))
+        # Rebuilt from the rolling percentiles four times a second at 60 fps
+        if self._profile_overlay is None or self.profiler.frames - self._profile_overlay_frame >= 15:
+            self._profile_overlay = self._render_profile_overlay()
+            self._profile_overlay_frame = self.profiler.frames
+            updated = self._profile_overlay.get_rect(topleft=position)
+        self.screen.blit(self._profile_overlay, position)
+        return updated
+
+    def _render_title(self) -> pygame.Surface:
+        return text_cache.render("Epic Memory Match!", self.title_font, (255, 255, 255)).convert_alpha()
 
     def draw_start_screen(self) -> None:
             self.screen.fill(self.background_color)
             
-            for particle in self.particles:
-                pygame.draw.circle(self.screen, (int(particle[4]),) * 3, 
-                                (int(particle[0]), int(particle[1])), int(particle[5]))
+            self.particles.draw(self.screen)
                 
             self.exit_button.draw(self.screen)
 
-            title_text = self.title_font.render("Epic Memory Match!", True, (255, 255, 255))
-            title_rect = title_text.get_rect(center=(self.screen.get_width() // 2, 200))
+            title_text = self.layers.get("title", self._render_title)
+            title_rect = title_text.get_rect(center=(self.screen.get_width() // 2, self.units(200)))
             self.screen.blit(title_text, title_rect)
 
             self.start_button.draw(self.screen)
             self.quit_button.draw(self.screen)
         
-    def run(self) -> None:
-        clock = pygame.time.Clock()
-        while True:
-            current_time = time.time()
-            
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    return
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_ESCAPE:
-                        pygame.quit()
-                        return
-                    elif event.key == pygame.K_f:
-                        self.fullscreen = not self.fullscreen
-                        self.screen = self.set_screen_mode()
-                        self.setup_level()
-                if event.type == pygame.MOUSEBUTTONDOWN:
-                    if self.exit_button.rect.collidepoint(event.pos):
-                        pygame.quit()
-                        return
-                        
-                    if not self.game_started:
-                        if self.start_button.is_clicked(event.pos):
-                            self.game_started = True
-                            self.countdown_start = current_time
-                            self.state.game_time = 0
-                        elif self.quit_button.is_clicked(event.pos):
-                            pygame.quit()
-                            return
-                    elif self.state.game_active and not self.transition_active:
-                        self.handle_click(event.pos, current_time)
-
-            if not self.game_started:
-                self.update_particles()
-                self.draw_start_screen()
-            else:
-                countdown_elapsed = current_time - self.countdown_start
-                
-                if countdown_elapsed < 3:
-                    self.screen.fill(self.background_color)
-                    countdown_text = self.title_font.render(
-                        str(3 - int(countdown_elapsed)), 
-                        True, 
-                        (255, 255, 255)
-                    )
-                    countdown_rect = countdown_text.get_rect(
-                        center=(self.screen.get_width() // 2, self.screen.get_height() // 2)
-                    )
-                    self.screen.blit(countdown_text, countdown_rect)
-                else:
-                    if not self.state.game_active:  # First frame after countdown
-                        self.state.game_active = True
-                        self.state.game_time = 0
-                    
-                    if self.state.game_active and not self.transition_active:
-                        self.state.game_time = current_time - (self.countdown_start + 3)
-                    
-                    self.update_tiles(current_time)
-                    self.update_particles()
-
-                    # Handle level completion and transitions
-                    required_matches = (self.grid_size * self.grid_size) // 2
-                    if self.state.matches_found == required_matches:
-                        if not self.transition_active:
-                            self.transition_active = True
-                            self.transition_start_time = current_time
-                            if self.state.level == 1:
-                                self.show_transition_screen(
-                                    "EXPERIMENT 1 COMPLETE!",
-                                    "Preparing Level 2... More complex level ahead!"
-                                )
-                            else:
-                                self.show_transition_screen(
-                                    "CONGRATULATIONS! ALL EXPERIMENTS COMPLETE!",
-                                    f"Final Score: {self.state.score} - Time: {self.state.game_time:.1f}s"
-                                )
-                                time.sleep(2)  # Show final screen for 2 seconds
-                                pygame.quit()
-                                return
-
-                        if current_time - self.transition_start_time >= 2:  # Wait 2 seconds before proceeding
-                            if self.state.level == 1:
-                                self.start_next_level()
-                            else:
-                                self.state.game_complete = True
-                                pygame.quit()
-                                return
-
-                    # Only draw game if not in transition
-                    if not self.transition_active:
-                        self.draw_laboratory_ui()
-                        for tile in self.tiles.values():
-                            self.draw_tile(tile)
+    def quit(self) -> None:
+        self.running = False
+        if self.recorder is not None:
+            self.recorder.end(self.state, self.timestep.time)
+
+    def start_countdown(self, current_time: float) -> None:
+        self.game_started = True
+        if self.recorder is not None:
+            self.recorder.start(round(1 / self.timestep.step), current_time)
+        if not self.board_ready:
+            self.setup_level()
+        self.countdown_start = current_time
+        self.state.game_time = 0
+        self.play_start = current_time + self.COUNTDOWN_SECONDS
+        self.timers.schedule(self.play_start, self.begin_play)
+
+    def begin_play(self) -> None:
+        self.state.game_active = True
+        self.state.game_time = 0
+
+    def begin_transition(self, current_time: float) -> None:
+        self.transition_active = True
+        self.transition_start_time = current_time
+        self.transition_drawn = False
+        # Fade in, hold, then either fade out over the next level or finish
+        fade_in = self.timeline.add(current_time, self.TRANSITION_FADE_SECONDS, self._set_transition_fade,
+                                    easing=ease_out_cubic)
+        hold = self.TRANSITION_SECONDS - self.TRANSITION_FADE_SECONDS
+        if not self.engine.is_final_level:
+            self.transition_text = (
+                "EXPERIMENT 1 COMPLETE!",
+                "Preparing Level 2... More complex level ahead!"
+            )
+            fade_in.then(hold, on_done=self.start_next_level).then(
+                self.TRANSITION_FADE_SECONDS, lambda value: self._set_transition_fade(1 - value),
+                on_done=self._end_transition_fade, easing=ease_in_out)
+        else:
+            self.transition_text = (
+                "CONGRATULATIONS! ALL EXPERIMENTS COMPLETE!",
+                f"Final Score: {self.state.score} - Time: {self.state.game_time:.1f}s"
+            )
+            fade_in.then(hold, on_done=self.finish_game)
+
+    def finish_game(self) -> None:
+        self.state.game_complete = True
+        self.quit()
+
+    def handle_event(self, event: pygame.event.Event, current_time: float) -> None:
+        if event.type == pygame.QUIT:
+            self.quit()
+        elif event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_ESCAPE:
+                self.quit()
+            elif event.key == pygame.K_f:
+                self.fullscreen = not self.fullscreen
+                self.screen = self.set_screen_mode()
+                with self.profiler.scope("relayout"):
+                    self.relayout()
+            elif event.key == pygame.K_F3:
+                self.show_profile = not self.show_profile
+                self.profiler.enabled = self.profiler.enabled or self.show_profile
+                self._profile_overlay = None
+                self.dirty_tracker.invalidate()
+        elif event.type == pygame.MOUSEBUTTONDOWN:
+            if self.exit_button.rect.collidepoint(event.pos):
+                self.quit()
+            elif not self.game_started:
+                if self.start_button.is_clicked(event.pos):
+                    self.start_countdown(current_time)
+                elif self.quit_button.is_clicked(event.pos):
+                    self.quit()
+            elif self.state.game_active and not self.transition_active:
+                self.handle_click(event.pos, current_time)
+
+    def step(self, current_time: float, particles: bool = True) -> None:
+        # One fixed logic step; particle motion was tuned per 60 Hz frame
+        self.timers.run_due(current_time)
+        self.timeline.update(current_time)
+        frames = self.timestep.step * 60
+        if not self.game_started or not self.state.game_active:
+            if particles:
+                with self.profiler.scope("particles"):
+                    self.update_particles(frames)
+            return
+
+        if not self.transition_active:
+            self.state.game_time = current_time - self.play_start
+        resetting = self.engine.waiting_for_reset
+        with self.profiler.scope("tiles"):
+            self.update_tiles(current_time)
+        if resetting and not self.engine.waiting_for_reset:
+            self.audio.play("flip")
+        if particles:
+            with self.profiler.scope("particles"):
+                self.update_particles(frames)
+
+        # Handle level completion and transitions
+        if self.engine.level_complete and not self.transition_active:
+            self.begin_transition(current_time)
+
+    def is_idle(self) -> bool:
+        # Nothing on screen changes before the next input or next_redraw()
+        if self.transition_active or self.timeline or not self.assets.ready:
+            return False
+        if self.board_ready and (self.board.active or self.waiting_for_reset):
+            return False
+        return True
+
+    def next_redraw(self) -> float:
+        # Simulation time of the next change an idle screen still has to show
+        now = self.timestep.time
+        due = min(self.timers.next_due(), now + self.MAX_IDLE_SECONDS)
+        if self.state.game_active:
+            # The HUD clock is rounded to tenths of a second
+            tenths = math.floor((now - self.play_start) * 10 + 0.5)
+            due = min(due, self.play_start + (tenths + 0.5) / 10)
+        elif self.game_started:
+            due = min(due, self.countdown_start + math.floor(now - self.countdown_start) + 1)
+        if self.idle_particle_fps > 0:
+            due = min(due, now + 1 / self.idle_particle_fps)
+        return due
+
+    def wait_for_activity(self) -> List[pygame.event.Event]:
+        # Blocks until input arrives or the next redraw is due; input wakes
+        # the loop immediately, so idling adds no latency
+        ahead = self.timestep.time + self.timestep.accumulator
+        wall_seconds = (self.next_redraw() - ahead) / getattr(self.clock, "scale", 1.0)
+        event = pygame.event.wait(max(math.ceil(wall_seconds * 1000) + 1, 1))
+        return [] if event.type == pygame.NOEVENT else [event]
+
+    def render(self) -> None:
+        if not self.game_started:
+            self.draw_start_screen()
+        elif not self.state.game_active:
+            countdown_elapsed = self.timestep.time - self.countdown_start
+            self.screen.fill(self.background_color)
+            countdown_text = text_cache.render(
+                str(self.COUNTDOWN_SECONDS - int(countdown_elapsed)), 
+                self.title_font, 
+                (255, 255, 255)
+            )
+            countdown_rect = countdown_text.get_rect(
+                center=(self.screen.get_width() // 2, self.screen.get_height() // 2)
+            )
+            self.screen.blit(countdown_text, countdown_rect)
+        elif self.transition_active:
+            # Redrawn while fading in, then left on screen until the level changes
+            if not self.transition_drawn:
+                self._refresh_board_layer(self.board.take_changed())
+                self.draw_laboratory_ui()
+                self.draw_board()
+                self.show_transition_screen(*self.transition_text, self.transition_fade)
+                self.transition_drawn = self.transition_fade >= 1
+        else:
+            self.draw_game_frame()
+            return
 
+        # Anything outside the board view redraws the whole screen
+        self.dirty_tracker.invalidate()
+        self.draw_profile_overlay()
+        self.startup.mark("first_render")
+        with self.profiler.scope("present"):
             pygame.display.flip()
-            clock.tick(60)
+        self.startup.mark("first_flip")
+
+    def run(self) -> None:
+        frame_clock = pygame.time.Clock()
+        self.running = True
+        last_time = self.clock()
+        profiler = self.profiler
+        idle = False
+        woken_by: List[pygame.event.Event] = []
+        while self.running:
+            profiler.begin_frame()
+            now = self.clock()
+            steps = self.timestep.advance(now - last_time)
+            last_time = now
+
+            if idle:
+                # Nothing animated while blocked: catch the simulation up
+                # without per-step particle work, then apply the input
+                for _ in range(steps):
+                    self.step(self.timestep.tick(), particles=False)
+                if steps and self.idle_particle_fps > 0:
+                    self.update_particles(steps * self.timestep.step * 60)
+                steps = 0
+
+            # Input is applied at the current simulation time, before stepping
+            with profiler.scope("events"):
+                if not woken_by:
+                    self.input_time = time.perf_counter()
+                for event in woken_by + pygame.event.get():
+                    self.handle_event(event, self.timestep.time)
+            woken_by = []
+
+            for _ in range(steps):
+                if not self.running:
+                    break
+                self.step(self.timestep.tick())
+
+            if self.running:
+                self.render()
+                if self.exit_after_first_frame:
+                    self.quit()
+                    break
+                with profiler.scope("assets"):
+                    self.poll_assets()
+                idle = self.power_save and self.is_idle()
+                with profiler.scope("wait"):
+                    if idle:
+                        woken_by = self.wait_for_activity()
+                        self.input_time = time.perf_counter()
+                    else:
+                        frame_clock.tick(60)
+            profiler.end_frame()
+        pygame.quit()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Little Scientists memory matching game")
+    parser.add_argument("--dirty-rects", action="store_true",
+                        help="only redraw and present the screen areas that changed")
+    parser.add_argument("--particles", type=int, default=50,
+                        help="number of background particles")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="seed for board layouts and particles, for reproducible runs")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="simulation speed multiplier (e.g. 100 to fast-forward)")
+    parser.add_argument("--mute", action="store_true",
+                        help="do not play background music")
+    parser.add_argument("--no-sound", action="store_true",
+                        help="do not play sound effects")
+    parser.add_argument("--grid", type=parse_grid, default=None, metavar="ROWSxCOLS",
+                        help="play a single custom-sized board instead of the two standard levels")
+    parser.add_argument("--pair-distance", type=int, default=2,
+                        help="with --grid, minimum Manhattan distance between the tiles of a pair (2 keeps pairs apart)")
+    parser.add_argument("--startup-benchmark", choices=("text", "json"), default=None,
+                        help="exit after the first frame and report import, init, first-render and first-flip times")
+    parser.add_argument("--power-save", action="store_true",
+                        help="stop redrawing while nothing animates and wait for input instead")
+    parser.add_argument("--idle-particle-fps", type=float, default=0.0,
+                        help="with --power-save, keep background particles moving at this rate while idle")
+    parser.add_argument("--record", type=str, default=None, metavar="PATH",
+                        help="record the session (deals, clicks, outcomes) to PATH for recording.py to replay")
+    parser.add_argument("--profile", type=str, default=None, metavar="PATH",
+                        help="record per-frame phase timings and write them to PATH (.csv or .json) on exit")
+    args = parser.parse_args()
+    levels = None
+    if args.grid:
+        spec = LevelSpec(*args.grid, min_pair_distance=args.pair_distance)
+        # Rejected here, before the window opens, rather than by the first deal
+        try:
+            check_spec(spec)
+        except ValueError as exc:
+            parser.error(f"--grid {spec.rows}x{spec.cols}: {exc}")
+        levels = {1: spec}
+    clock = ScaledClock(args.speed) if args.speed != 1.0 else time.perf_counter
+    recorder = SessionRecorder(args.record) if args.record else None
+    game = ScienceGame(dirty_rects=args.dirty_rects, particle_count=args.particles,
+                       clock=clock, seed=args.seed, levels=levels, music=not args.mute,
+                       profile=args.profile is not None, power_save=args.power_save,
+                       idle_particle_fps=args.idle_particle_fps, recorder=recorder,
+                       sound=not args.no_sound)
+    game.exit_after_first_frame = args.startup_benchmark is not None
+    game.run()
+    game.board_pool.close()
+    if recorder is not None:
+        recorder.close()
+    if args.profile:
+        game.profiler.export(args.profile)
+        print(game.profiler.report())
+        pool = game.board_pool
+        print(f"board pool: {pool.generated} boards generated at {pool.boards_per_second:.0f} boards/s, "
+              f"{pool.misses} generated on demand")
+        print(game.audio.report())
+        sprites = game.tile_sprites
+        if sprites is not None:
+            print(f"tile sprites: {len(sprites)} surfaces, {sprites.memory_bytes() / 1024:.0f} KiB")
+        lookups = text_cache.hits + text_cache.misses
+        print(f"text cache: {len(text_cache)} entries, {text_cache.hits}/{lookups} renders from cache")
+    if args.startup_benchmark == "json":
+        print(STARTUP.to_json())
+    elif args.startup_benchmark == "text":
+        print(STARTUP.report())
+
 
 if __name__ == "__main__":
-    ScienceGame().run()
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -0,0 +1,95 @@
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import pygame
+
+from layers import COLORKEY
+
+PARTICLE_DTYPE = np.dtype([
+    ("pos", np.float32, 2),
+    ("vel", np.float32, 2),
+    ("brightness", np.float32),
+    ("radius", np.int16),
+])
+
+MIN_RADIUS, MAX_RADIUS = 2, 5
+
+
+class ParticleField:
+    # Background particles stored as one structured array, updated with batched
+    # array operations and drawn as pre-rendered dot sprites in a single blits()
+    def __init__(self, size: Tuple[int, int], count: int = 50, seed: Optional[int] = None):
+        self.size = size
+        self.rng = np.random.default_rng(seed)
+        self.data = np.zeros(count, dtype=PARTICLE_DTYPE)
+        self.data["pos"][:, 0] = self.rng.integers(0, size[0], count, endpoint=True)
+        self.data["pos"][:, 1] = self.rng.integers(0, size[1], count, endpoint=True)
+        self.data["vel"] = self.rng.uniform(-0.5, 0.5, (count, 2))
+        self.data["brightness"] = self.rng.integers(150, 255, count, endpoint=True)
+        self.data["radius"] = self.rng.integers(MIN_RADIUS, MAX_RADIUS, count, endpoint=True)
+        # One sprite per (radius, brightness) so drawing never rasterizes circles.
+        # An object array lets numpy pick every particle's sprite in one gather.
+        self._sprites = np.empty((MAX_RADIUS + 1, 256), dtype=object)
+        self._sprite_ready = np.zeros((MAX_RADIUS + 1, 256), dtype=bool)
+
+    @staticmethod
+    def _render_sprite(radius: int, level: int) -> pygame.Surface:
+        surface = pygame.Surface((2 * radius + 1, 2 * radius + 1))
+        surface.fill(COLORKEY)
+        pygame.draw.circle(surface, (level,) * 3, (radius, radius), radius)
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert()
+        surface.set_colorkey(COLORKEY, pygame.RLEACCEL)
+        return surface
+
+    def _ensure_sprites(self, radius: np.ndarray, levels: np.ndarray) -> None:
+        # Sprites are rendered the first time a (radius, brightness) pair is drawn
+        missing = ~self._sprite_ready[radius, levels]
+        if missing.any():
+            for r, b in set(zip(radius[missing].tolist(), levels[missing].tolist())):
+                self._sprites[r, b] = self._render_sprite(r, b)
+                self._sprite_ready[r, b] = True
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def resize(self, size: Tuple[int, int]) -> None:
+        self.size = size
+        self.data["pos"] %= np.array(size, dtype=np.float32)
+
+    def update(self, frames: float = 1.0) -> None:
+        # `frames` is measured in 60 Hz frames, the rate the motion was tuned for
+        width, height = self.size
+        pos = self.data["pos"]
+        pos += self.data["vel"] * np.float32(frames)
+        pos %= np.array((width, height), dtype=np.float32)
+        brightness = self.data["brightness"]
+        brightness -= np.float32(0.5 * frames)
+
+        faded = np.flatnonzero(brightness <= 0)
+        if faded.size:
+            pos[faded, 0] = self.rng.integers(0, width, faded.size, endpoint=True)
+            pos[faded, 1] = self.rng.integers(0, height, faded.size, endpoint=True)
+            brightness[faded] = self.rng.integers(150, 255, faded.size, endpoint=True)
+
+    def _blit_sequence(self, indices: Optional[Sequence[int]] = None):
+        data = self.data if indices is None else self.data[np.asarray(indices, dtype=np.intp)]
+        radius = data["radius"].astype(np.intp)
+        topleft = data["pos"].astype(np.intp) - radius[:, None]
+        levels = np.clip(data["brightness"], 0, 255).astype(np.intp)
+        self._ensure_sprites(radius, levels)
+        return zip(self._sprites[radius, levels].tolist(), topleft.tolist())
+
+    def draw(self, surface: pygame.Surface, indices: Optional[Sequence[int]] = None) -> None:
+        surface.blits(self._blit_sequence(indices), doreturn=False)
+
+    def blit_list(self) -> List[Tuple[pygame.Surface, Tuple[int, int]]]:
+        # Every particle's (sprite, position), for callers that draw many subsets in one frame
+        return list(self._blit_sequence())
+
+    def footprints(self) -> List[Tuple[pygame.Rect, int]]:
+        radius = self.data["radius"].astype(np.intp)
+        topleft = self.data["pos"].astype(np.intp) - radius[:, None]
+        levels = np.clip(self.data["brightness"], 0, 255).astype(np.intp)
+        return [(pygame.Rect(x, y, 2 * r + 1, 2 * r + 1), b)
+                for (x, y), r, b in zip(topleft.tolist(), radius.tolist(), levels.tolist())]
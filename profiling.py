@@ -0,0 +1,166 @@
+import csv
+import json
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class StartupProfiler:
+    # Named wall-clock marks from the first line of the game module to the
+    # first presented frame. Each mark is recorded once; later calls are no-ops.
+    def __init__(self, origin: Optional[float] = None):
+        self.origin = origin if origin is not None else time.perf_counter()
+        self.marks: Dict[str, float] = {}
+
+    def mark(self, name: str) -> None:
+        if name not in self.marks:
+            self.marks[name] = time.perf_counter()
+
+    def phases(self) -> List[Tuple[str, float]]:
+        # Duration of each phase in milliseconds, measured from the previous mark
+        phases = []
+        previous = self.origin
+        for name, stamp in self.marks.items():
+            phases.append((name, (stamp - previous) * 1000))
+            previous = stamp
+        return phases
+
+    @property
+    def total_ms(self) -> float:
+        if not self.marks:
+            return 0.0
+        return (max(self.marks.values()) - self.origin) * 1000
+
+    def report(self) -> str:
+        lines = [f"{name:<14}{ms:9.1f} ms" for name, ms in self.phases()]
+        lines.append(f"{'total':<14}{self.total_ms:9.1f} ms")
+        return "\n".join(lines)
+
+    def to_json(self) -> str:
+        return json.dumps({"phases_ms": dict(self.phases()), "total_ms": self.total_ms}, indent=2)
+
+
+class _NullScope:
+    # Shared by every disabled scope() call, so leaving the instrumentation in
+    # costs one method call and an attribute test per phase
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc) -> bool:
+        return False
+
+
+_NULL_SCOPE = _NullScope()
+
+
+class _Scope:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler: "FrameProfiler", name: str):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc) -> bool:
+        elapsed = time.perf_counter() - self.start
+        current = self.profiler._current
+        current[self.name] = current.get(self.name, 0.0) + elapsed
+        return False
+
+
+class FrameProfiler:
+    # Per-frame durations of named phases. Scopes opened more than once in a
+    # frame accumulate; percentiles cover the last `window` frames and up to
+    # `max_records` frames are kept for export. Time in `idle_phases` (the
+    # frame-rate tick, waiting for input) is not work: a frame is slow when the
+    # rest of it runs over `budget_ms`, however long the loop then slept.
+    def __init__(self, enabled: bool = False, window: int = 240, max_records: int = 100_000,
+                 budget_ms: float = 1000 / 60, idle_phases: Sequence[str] = ("wait",)):
+        self.enabled = enabled
+        self.window = window
+        self.budget_ms = budget_ms
+        self.idle_phases = tuple(idle_phases)
+        self.phases: List[str] = []
+        self.records: Deque[Tuple[int, float, Dict[str, float]]] = deque(maxlen=max_records)
+        self.frames = 0
+        self.slow_frames = 0
+        self._scopes: Dict[str, _Scope] = {}
+        self._current: Dict[str, float] = {}
+        self._frame_start = 0.0
+
+    def scope(self, name: str):
+        if not self.enabled:
+            return _NULL_SCOPE
+        scope = self._scopes.get(name)
+        if scope is None:
+            scope = self._scopes[name] = _Scope(self, name)
+            self.phases.append(name)
+        return scope
+
+    def begin_frame(self) -> None:
+        if self.enabled:
+            self._current = {}
+            self._frame_start = time.perf_counter()
+
+    def end_frame(self) -> None:
+        if not self.enabled or not self._frame_start:
+            return
+        total_ms = (time.perf_counter() - self._frame_start) * 1000
+        phases = {name: s * 1000 for name, s in self._current.items()}
+        self.records.append((self.frames, total_ms, phases))
+        self.frames += 1
+        if self.work_ms(total_ms, phases) > self.budget_ms:
+            self.slow_frames += 1
+        self._frame_start = 0.0
+
+    def work_ms(self, total_ms: float, phases: Dict[str, float]) -> float:
+        return total_ms - sum(phases.get(name, 0.0) for name in self.idle_phases)
+
+    def percentiles(self, quantiles: Sequence[float] = (50, 95, 99)) -> Dict[str, List[float]]:
+        # "work" is the frame without its idle phases, the rest are the phases
+        # in first-use order
+        recent = list(self.records)[-self.window:]
+        if not recent:
+            return {}
+        columns = {"work": [self.work_ms(total, phases) for _, total, phases in recent]}
+        for name in self.phases:
+            columns[name] = [phases.get(name, 0.0) for _, _, phases in recent]
+        return {name: np.percentile(values, quantiles).tolist() for name, values in columns.items()}
+
+    def report(self) -> str:
+        lines = [f"{'phase':<12}{'p50':>8}{'p95':>8}{'p99':>8}"]
+        for name, (p50, p95, p99) in self.percentiles().items():
+            lines.append(f"{name:<12}{p50:8.2f}{p95:8.2f}{p99:8.2f}")
+        lines.append(self.summary())
+        return "\n".join(lines)
+
+    def summary(self) -> str:
+        return f"{self.slow_frames}/{self.frames} frames with over {self.budget_ms:.1f} ms of work"
+
+    def export(self, path: str) -> None:
+        # CSV for paths ending in .csv, JSON otherwise; times are milliseconds
+        if path.lower().endswith(".csv"):
+            with open(path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["frame", "total_ms", "work_ms", *self.phases])
+                for frame, total, phases in self.records:
+                    writer.writerow([frame, f"{total:.4f}", f"{self.work_ms(total, phases):.4f}",
+                                     *(f"{phases.get(name, 0.0):.4f}" for name in self.phases)])
+            return
+        with open(path, "w") as f:
+            json.dump({
+                "budget_ms": self.budget_ms,
+                "frames": self.frames,
+                "slow_frames": self.slow_frames,
+                "percentiles_ms": {name: dict(zip(("p50", "p95", "p99"), values))
+                                   for name, values in self.percentiles().items()},
+                "records": [{"frame": frame, "total_ms": total, "work_ms": self.work_ms(total, phases), **phases}
+                            for frame, total, phases in self.records],
+            }, f)
@@ -0,0 +1,266 @@
+import argparse
+import os
+import struct
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple
+
+import pygame
+
+from board import Board, LevelSpec, Position
+from engine import IGNORED, MATCH, MISMATCH, SELECTED, GameState
+
+if TYPE_CHECKING:
+    from matching_game import ScienceGame
+
+# Every record is kind, outcome, level, a, b, time. What a and b hold depends
+# on the kind: START (logic_hz, -), LEVEL (rows, cols) followed by one CELL
+# (cell index, color) per tile, CLICK (row, col) and END (score, matches_found).
+HEADER = b"SMGR\x01\x00\x00\x00"
+RECORD = struct.Struct("<BBhiid")
+START, LEVEL, CELL, CLICK, END = range(1, 6)
+OUTCOMES = (IGNORED, SELECTED, MATCH, MISMATCH)
+OUTCOME_CODES = {outcome: code for code, outcome in enumerate(OUTCOMES)}
+
+Record = Tuple[int, int, int, int, int, float]
+
+
+class SessionRecorder:
+    # Records are packed into a preallocated ring buffer on the game thread
+    # and a background thread drains it to disk, so recording never waits on
+    # the file. Only a buffer that fills faster than the disk drains it
+    # makes the game thread wait (counted in `stalls`); records are never dropped.
+    def __init__(self, path: str, capacity: int = 65536, flush_interval: float = 0.25):
+        self.path = path
+        self.capacity = capacity
+        self.flush_interval = flush_interval
+        self.stalls = 0
+        self._buffer = bytearray(capacity * RECORD.size)
+        self._view = memoryview(self._buffer)
+        # Only the game thread advances _written, only the writer advances _flushed
+        self._written = 0
+        self._flushed = 0
+        self._ended = False
+        self._closed = False
+        self._wake = threading.Event()
+        self._file = open(path, "wb")
+        self._file.write(HEADER)
+        self._thread = threading.Thread(target=self._drain_loop, name="session-recorder", daemon=True)
+        self._thread.start()
+
+    def __len__(self) -> int:
+        return self._written
+
+    def _append(self, kind: int, code: int, level: int, a: int, b: int, t: float) -> None:
+        while self._written - self._flushed >= self.capacity:
+            self.stalls += 1
+            self._wake.set()
+            time.sleep(0.001)
+        RECORD.pack_into(self._buffer, (self._written % self.capacity) * RECORD.size, kind, code, level, a, b, t)
+        self._written += 1
+        if self._written - self._flushed >= self.capacity // 2:
+            self._wake.set()
+
+    def start(self, logic_hz: int, t: float) -> None:
+        self._append(START, 0, 0, logic_hz, 0, t)
+
+    def level(self, level: int, board: Board, t: float) -> None:
+        self._append(LEVEL, 0, level, board.rows, board.cols, t)
+        for index, color in zip(board.cells.tolist(), board.layout()):
+            self._append(CELL, 0, level, index, color, t)
+
+    def click(self, level: int, position: Position, outcome: str, t: float) -> None:
+        self._append(CLICK, OUTCOME_CODES[outcome], level, position[0], position[1], t)
+
+    def end(self, state: GameState, t: float) -> None:
+        # Only the first end of a session is kept
+        if not self._ended:
+            self._ended = True
+            self._append(END, 0, state.level, state.score, state.matches_found, t)
+
+    def _drain(self) -> None:
+        start, end = self._flushed, self._written
+        count = end - start
+        if not count:
+            return
+        first = start % self.capacity
+        head = min(count, self.capacity - first)
+        self._file.write(self._view[first * RECORD.size:(first + head) * RECORD.size])
+        if count > head:
+            self._file.write(self._view[:(count - head) * RECORD.size])
+        self._flushed = end
+
+    def _drain_loop(self) -> None:
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self._drain()
+        self._drain()
+        self._file.close()
+
+    def close(self) -> None:
+        self._closed = True
+        self._wake.set()
+        self._thread.join()
+
+
+def read_records(path: str) -> Iterator[Record]:
+    with open(path, "rb") as f:
+        data = f.read()
+    if not data.startswith(HEADER):
+        raise ValueError(f"{path} is not a session recording")
+    # A session cut short mid-write can end in a partial record
+    end = len(HEADER) + (len(data) - len(HEADER)) // RECORD.size * RECORD.size
+    return RECORD.iter_unpack(memoryview(data)[len(HEADER):end])
+
+
+@dataclass
+class Session:
+    logic_hz: int = 120
+    levels: Dict[int, LevelSpec] = field(default_factory=dict)
+    # The first deal of each level; later deals of a level are re-deals
+    layouts: Dict[int, List[int]] = field(default_factory=dict)
+    # (kind, time, payload) in recorded order
+    events: List[Tuple[int, float, tuple]] = field(default_factory=list)
+    end: Optional[Tuple[int, int, int]] = None
+
+    @classmethod
+    def load(cls, path: str) -> "Session":
+        session = cls()
+        cells: List[Tuple[int, int]] = []
+        pending: Optional[Tuple[int, int, int, float]] = None
+
+        def close_level() -> None:
+            if pending is None:
+                return
+            level, rows, cols, t = pending
+            present = {index for index, _ in cells}
+            holes = frozenset(divmod(i, cols) for i in range(rows * cols) if i not in present)
+            layout = [color for _, color in sorted(cells)]
+            session.levels.setdefault(level, LevelSpec(rows, cols, holes))
+            if level in session.layouts:
+                session.events.append((LEVEL, t, (level, layout)))
+            else:
+                session.layouts[level] = layout
+            cells.clear()
+
+        for kind, code, level, a, b, t in read_records(path):
+            if kind == CELL:
+                cells.append((a, b))
+                continue
+            close_level()
+            pending = None
+            if kind == START:
+                session.logic_hz = a
+                session.events.append((START, t, ()))
+            elif kind == LEVEL:
+                pending = (level, a, b, t)
+            elif kind == CLICK:
+                session.events.append((CLICK, t, ((a, b), OUTCOMES[code])))
+            elif kind == END:
+                session.end = (level, a, b)
+                session.events.append((END, t, ()))
+        close_level()
+        return session
+
+    @property
+    def clicks(self) -> int:
+        return sum(1 for kind, _, _ in self.events if kind == CLICK)
+
+
+@dataclass
+class ReplayResult:
+    clicks: int = 0
+    divergences: List[Tuple[float, Position, str, str]] = field(default_factory=list)
+    expected: Optional[Tuple[int, int, int]] = None
+    actual: Optional[Tuple[int, int, int]] = None
+    seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return not self.divergences and self.expected == self.actual
+
+
+class SessionReplayer:
+    # Feeds a recorded session back through ScienceGame.handle_click on the
+    # same fixed steps it was recorded at. Fast replay skips particles and
+    # drawing; realtime replay paces steps to the wall clock and renders at 60 fps.
+    def __init__(self, session: Session, realtime: bool = False):
+        self.session = session
+        self.realtime = realtime
+
+    def _advance_to(self, game: "ScienceGame", t: float) -> None:
+        target = round(t * self.session.logic_hz)
+        timestep = game.timestep
+        frame_steps = max(self.session.logic_hz // 60, 1)
+        while timestep.steps < target and game.running:
+            game.step(timestep.tick(), particles=self.realtime)
+            if self.realtime and timestep.steps % frame_steps == 0:
+                game.render()
+                # Only closing the window or Escape is honoured while watching
+                for event in pygame.event.get((pygame.QUIT, pygame.KEYDOWN)):
+                    if event.type == pygame.QUIT or event.key == pygame.K_ESCAPE:
+                        game.running = False
+                delay = self._wall_start + timestep.time - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+
+    def replay(self, game: "ScienceGame") -> ReplayResult:
+        # `game` is a fresh ScienceGame built with the session's levels and logic rate
+        session = self.session
+        game.engine.layouts.update(session.layouts)
+        game.running = True
+        result = ReplayResult()
+        began = self._wall_start = time.perf_counter()
+        for kind, t, payload in session.events:
+            self._advance_to(game, t)
+            if not game.running:
+                break
+            if kind == START:
+                game.start_countdown(t)
+            elif kind == LEVEL:
+                level, layout = payload
+                game.engine.layouts[level] = layout
+                game.setup_level()
+            elif kind == CLICK:
+                position, expected = payload
+                outcome = game.handle_click(game.tile_rect(position).center, t)
+                result.clicks += 1
+                if outcome != expected:
+                    result.divergences.append((t, position, expected, outcome))
+            elif kind == END:
+                break
+        state = game.state
+        result.expected = session.end
+        result.actual = (state.level, state.score, state.matches_found)
+        result.seconds = time.perf_counter() - began
+        return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay a recorded session and verify its score")
+    parser.add_argument("path", help="session file written by matching_game.py --record")
+    parser.add_argument("--realtime", action="store_true", help="replay on screen at recorded speed")
+    args = parser.parse_args()
+    if not args.realtime:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+    from matching_game import ScienceGame
+    session = Session.load(args.path)
+    game = ScienceGame(logic_hz=session.logic_hz, levels=session.levels, music=False)
+    result = SessionReplayer(session, args.realtime).replay(game)
+
+    print(f"{result.clicks} clicks replayed in {result.seconds * 1000:.1f} ms")
+    for t, position, expected, outcome in result.divergences:
+        print(f"  t={t:.3f}s {position}: recorded {expected}, replayed {outcome}")
+    if result.expected is None:
+        print("recording has no end record; nothing to verify")
+    else:
+        print(f"recorded level/score/matches {result.expected}, replayed {result.actual}")
+    print("OK" if result.ok else "MISMATCH")
+    raise SystemExit(0 if result.ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import random
+import time
+from typing import Dict, List, Optional, Set
+
+from engine import IGNORED, MATCH, GameEngine
+
+DEFAULT_PORT = 8765
+
+
+class ClassroomSession:
+    # One student's game on the shared event loop. Nothing is polled: after
+    # every click the engine says when it next has work (a flip finishing or
+    # a mismatch reset) and a single loop timer is armed for that moment.
+    TRANSITION_SECONDS = 2
+
+    def __init__(self, server: "ClassroomServer", session_id: int, writer: asyncio.StreamWriter):
+        self.server = server
+        self.id = session_id
+        self.writer = writer
+        self.loop = server.loop
+        self.engine = GameEngine(clock=self.loop.time, rng=random.Random(session_id))
+        self.engine.state.game_active = True
+        self.outcomes: List[list] = []
+        self.messages: List[dict] = []
+        self.transition: Optional[asyncio.TimerHandle] = None
+        self._wake: Optional[asyncio.TimerHandle] = None
+        self._wake_due = math.inf
+        self._send_level()
+
+    def _send_level(self) -> None:
+        board = self.engine.board
+        holes = [index for index in range(board.rows * board.cols) if board.color[index] < 0]
+        self.messages.append({"type": "level", "level": self.engine.state.level,
+                              "rows": board.rows, "cols": board.cols, "holes": holes})
+        board.take_changed()
+        self.server.mark_dirty(self)
+
+    def click(self, row: int, col: int) -> None:
+        outcome = self.engine.click(row, col, self.loop.time()) if self.transition is None else IGNORED
+        self.outcomes.append([row, col, outcome])
+        if outcome == MATCH and self.engine.level_complete:
+            self.transition = self.loop.call_later(self.TRANSITION_SECONDS, self._end_level)
+        self._schedule()
+        self.server.clicks += 1
+        self.server.mark_dirty(self)
+
+    def new_game(self) -> None:
+        self.close()
+        self.engine = GameEngine(clock=self.loop.time, rng=self.engine.rng)
+        self.engine.state.game_active = True
+        self._send_level()
+
+    def _schedule(self) -> None:
+        due = self.engine.next_event_time()
+        if due == self._wake_due:
+            return
+        if self._wake is not None:
+            self._wake.cancel()
+            self._wake = None
+        self._wake_due = due
+        if due < math.inf:
+            self._wake = self.loop.call_at(due, self._on_wake, due)
+
+    def _on_wake(self, due: float) -> None:
+        # The loop may fire a timer up to its clock resolution early
+        self._wake = None
+        self._wake_due = math.inf
+        self.engine.update(max(self.loop.time(), due))
+        self._schedule()
+        self.server.mark_dirty(self)
+
+    def _end_level(self) -> None:
+        self.transition = None
+        if self.engine.is_final_level:
+            self.engine.state.game_complete = True
+            self.engine.state.game_active = False
+            self.server.games_completed += 1
+            self.server.mark_dirty(self)
+            return
+        self.close()
+        self.engine.start_next_level()
+        self._send_level()
+
+    def take_diff(self) -> dict:
+        # Cells whose face changed since the last broadcast. A cell's face is
+        # its color while it is up or turning up and -1 while down or turning down.
+        board = self.engine.board
+        cells = []
+        for index in board.take_changed():
+            face_up = bool(board.revealed[index]) != (index in board.active)
+            cells.append([index, int(board.color[index]) if face_up else -1, bool(board.matched[index])])
+        state = self.engine.state
+        diff = {"type": "diff", "cells": cells, "outcomes": self.outcomes, "score": state.score,
+                "matches": state.matches_found, "level": state.level, "complete": state.game_complete}
+        self.outcomes = []
+        return diff
+
+    def close(self) -> None:
+        for handle in (self._wake, self.transition):
+            if handle is not None:
+                handle.cancel()
+        self._wake = self.transition = None
+        self._wake_due = math.inf
+
+
+class ClassroomServer:
+    # Hosts many sessions in one process over newline-delimited JSON on TCP.
+    # Clients send {"op": "click", "row": r, "col": c} or {"op": "new"}; the
+    # server sends each session's level layouts and state diffs in batches,
+    # one write per session every `broadcast_interval` seconds at most.
+    def __init__(self, host: str = "127.0.0.1", port: int = DEFAULT_PORT, broadcast_interval: float = 0.05,
+                 max_buffer: int = 1 << 20):
+        self.host = host
+        self.port = port
+        self.broadcast_interval = broadcast_interval
+        self.max_buffer = max_buffer
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.sessions: Dict[int, ClassroomSession] = {}
+        self.clicks = 0
+        self.broadcasts = 0
+        self.games_completed = 0
+        self._dirty: Set[ClassroomSession] = set()
+        self._ids = itertools.count(1)
+
+    def mark_dirty(self, session: ClassroomSession) -> None:
+        self._dirty.add(session)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        session = ClassroomSession(self, next(self._ids), writer)
+        self.sessions[session.id] = session
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                    if message["op"] == "click":
+                        session.click(int(message["row"]), int(message["col"]))
+                    elif message["op"] == "new":
+                        session.new_game()
+                except (ValueError, KeyError, TypeError):
+                    continue
+        except ConnectionError:
+            pass
+        finally:
+            session.close()
+            self.sessions.pop(session.id, None)
+            self._dirty.discard(session)
+            writer.close()
+
+    def broadcast(self) -> None:
+        dirty, self._dirty = self._dirty, set()
+        for session in dirty:
+            transport = session.writer.transport
+            if transport.is_closing():
+                continue
+            if transport.get_write_buffer_size() > self.max_buffer:
+                # A client that stopped reading is dropped rather than buffered forever
+                transport.abort()
+                continue
+            lines = [json.dumps(message) for message in session.messages]
+            session.messages.clear()
+            lines.append(json.dumps(session.take_diff()))
+            session.writer.write(("\n".join(lines) + "\n").encode())
+            self.broadcasts += 1
+
+    async def _broadcast_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.broadcast_interval)
+            self.broadcast()
+
+    async def _stats_loop(self, interval: float) -> None:
+        last = (time.perf_counter(), time.process_time(), self.clicks, self.broadcasts)
+        while True:
+            await asyncio.sleep(interval)
+            now = (time.perf_counter(), time.process_time(), self.clicks, self.broadcasts)
+            wall = now[0] - last[0]
+            print(f"{len(self.sessions)} sessions, {(now[2] - last[2]) / wall:.0f} clicks/s, "
+                  f"{(now[3] - last[3]) / wall:.0f} broadcasts/s, {(now[1] - last[1]) / wall:.0%} CPU, "
+                  f"{self.games_completed} games completed", flush=True)
+            last = now
+
+    async def serve(self, stats_interval: float = 0.0) -> None:
+        self.loop = asyncio.get_running_loop()
+        server = await asyncio.start_server(self._handle, self.host, self.port, backlog=1024)
+        tasks = [asyncio.create_task(self._broadcast_loop())]
+        if stats_interval > 0:
+            tasks.append(asyncio.create_task(self._stats_loop(stats_interval)))
+        print(f"serving on {self.host}:{self.port}", flush=True)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Host many headless matching games for a classroom")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--broadcast-interval", type=float, default=0.05,
+                        help="seconds between batched state diffs")
+    parser.add_argument("--stats", type=float, default=5.0, help="seconds between load reports (0 for none)")
+    args = parser.parse_args()
+    server = ClassroomServer(args.host, args.port, args.broadcast_interval)
+    try:
+        asyncio.run(server.serve(args.stats))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Headless SDL, so the suite runs without a display or sound device
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,44 @@
+import pygame
+import pytest
+
+from audio import VOICES, AudioSystem
+
+
+@pytest.fixture
+def audio():
+    system = AudioSystem(voices=VOICES)
+    if not system.start():
+        pytest.skip(f"no mixer: {system.errors}")
+    yield system
+    pygame.mixer.stop()
+    pygame.mixer.quit()
+
+
+def playing(audio: AudioSystem, name: str) -> int:
+    return sum(channel.get_sound() is audio.sounds[name] for channel in audio.channels)
+
+
+def test_flip_burst_never_cuts_off_the_level_chime(audio):
+    assert audio.play("level")
+    burst = 32
+    for _ in range(burst):
+        assert audio.play("flip")
+    assert playing(audio, "level") == 1
+    # The other voices took the first flips, every later one stole the oldest flip
+    assert audio.stolen == burst - (VOICES - 1)
+    assert audio.dropped == 0
+    assert audio.played == burst + 1
+
+
+def test_sound_is_dropped_when_every_voice_outranks_it(audio):
+    for _ in range(VOICES):
+        assert audio.play("level")
+    assert audio.stolen == 0
+    assert not audio.play("flip")
+    assert not audio.play("match")
+    assert audio.dropped == 2
+    assert playing(audio, "level") == VOICES
+    # An equal priority still takes the oldest voice
+    assert audio.play("level")
+    assert audio.stolen == 1
+    assert audio.played == VOICES + 1
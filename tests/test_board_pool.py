@@ -0,0 +1,43 @@
+import pytest
+
+from board import LevelSpec, check_spec
+from board_pool import BoardPool
+from engine import GameEngine
+
+
+@pytest.mark.parametrize("spec, message", [
+    (LevelSpec(3, 3), "odd number of tiles"),
+    (LevelSpec(1, 2, min_pair_distance=2), "do not fit"),
+    (LevelSpec(4, 4, min_pair_distance=6), "do not fit"),
+])
+def test_check_spec_rejects_boards_that_cannot_be_dealt(spec, message):
+    with pytest.raises(ValueError, match=message):
+        check_spec(spec)
+
+
+def test_check_spec_accepts_the_standard_levels():
+    for spec in GameEngine.LEVELS.values():
+        check_spec(spec)
+    check_spec(LevelSpec(4, 4, min_pair_distance=4))
+
+
+def test_take_raises_what_generation_raised():
+    spec = LevelSpec(4, 4, min_pair_distance=2)
+    pool = BoardPool([spec], seed=0, start=False)
+    generate = pool.generate
+
+    def failing(spec, index):
+        if index == 1:
+            raise ValueError("boom")
+        return generate(spec, index)
+
+    pool.generate = failing
+    pool.start()
+    try:
+        assert sorted(pool.take(spec)) == sorted(i // 2 for i in range(16))
+        with pytest.raises(ValueError, match="boom"):
+            pool.take(spec)
+        # The failure belongs to one layout; the pool keeps dealing after it
+        assert len(pool.take(spec)) == 16
+    finally:
+        pool.close()
@@ -0,0 +1,54 @@
+import random
+
+import pytest
+
+from bot import BotPlayer
+from engine import IGNORED, MATCH, MISMATCH, GameEngine
+from timing import ManualClock
+
+
+def pairs(engine: GameEngine):
+    by_color = {}
+    for position, tile in sorted(engine.tiles.items()):
+        by_color.setdefault(tile.color_index, []).append(position)
+    return [by_color[color] for color in sorted(by_color)]
+
+
+def test_settle_advances_exactly_as_the_rules_say():
+    clock = ManualClock()
+    engine = GameEngine(clock=clock, rng=random.Random(1))
+    bot = BotPlayer(engine, clock, random.Random(1))
+    (a, b), (c, _) = pairs(engine)[:2]
+
+    bot._click(a)
+    assert bot._click(c) == MISMATCH
+    began = clock.now
+    bot._settle()
+    # Both tiles flip up, wait out the reset delay, then flip back down
+    assert clock.now - began == pytest.approx(1.3)
+
+    bot._click(a)
+    assert bot._click(b) == MATCH
+    began = clock.now
+    bot._settle()
+    assert clock.now - began == pytest.approx(0.3)
+
+
+@pytest.mark.parametrize("memory", [0, 1])
+def test_memory_must_hold_a_turn(memory):
+    with pytest.raises(ValueError):
+        BotPlayer(GameEngine(clock=ManualClock()), ManualClock(), memory=memory)
+
+
+@pytest.mark.parametrize("memory", [2, 3])
+def test_limited_memory_never_clicks_a_cleared_tile(memory):
+    clock = ManualClock()
+    engine = GameEngine(clock=clock, rng=random.Random(3))
+    outcomes = []
+    click = engine.click
+    engine.click = lambda *args: outcomes.append(click(*args)) or outcomes[-1]
+    bot = BotPlayer(engine, clock, random.Random(3), memory=memory)
+    bot.play_game()
+    assert engine.state.game_complete
+    assert IGNORED not in outcomes
+    assert bot.clicks == len(outcomes)
@@ -0,0 +1,35 @@
+import random
+
+import pygame
+
+from dirty_rects import DirtyRectTracker
+
+
+def test_merge_covers_every_rect_without_overlap():
+    tracker = DirtyRectTracker((1280, 720))
+    rng = random.Random(0)
+    rects = [pygame.Rect(rng.randrange(-20, 1280), rng.randrange(-20, 720), rng.randrange(1, 60), rng.randrange(1, 60))
+             for _ in range(100)]
+    merged = tracker.merge(rects)
+    screen = pygame.Rect(0, 0, 1280, 720)
+    for rect in rects:
+        visible = rect.clip(screen)
+        if visible.width and visible.height:
+            covered = sum(visible.clip(area).width * visible.clip(area).height for area in merged)
+            assert covered == visible.width * visible.height
+    for i, area in enumerate(merged):
+        assert screen.contains(area)
+        assert area.collidelist(merged[i + 1:]) < 0
+
+
+def test_collect_falls_back_to_full_redraw():
+    tracker = DirtyRectTracker((1280, 720), max_dirty=8)
+    assert tracker.collect() is None
+    for x in range(4):
+        tracker.mark(pygame.Rect(x * 100, 0, 10, 10))
+    assert len(tracker.collect()) == 4
+    for x in range(9):
+        tracker.mark(pygame.Rect(x * 100, 0, 10, 10))
+    assert tracker.collect() is None
+    tracker.mark(pygame.Rect(0, 0, 1280, 400))
+    assert tracker.collect() is None
@@ -0,0 +1,30 @@
+import time
+
+from profiling import FrameProfiler
+
+
+def frame(profiler: FrameProfiler, work: float, wait: float) -> None:
+    profiler.begin_frame()
+    with profiler.scope("logic"):
+        time.sleep(work)
+    with profiler.scope("wait"):
+        time.sleep(wait)
+    profiler.end_frame()
+
+
+def test_waiting_does_not_make_a_frame_slow():
+    profiler = FrameProfiler(enabled=True, budget_ms=5)
+    for _ in range(3):
+        frame(profiler, work=0.0, wait=0.02)
+    assert profiler.slow_frames == 0
+    frame(profiler, work=0.02, wait=0.0)
+    assert (profiler.slow_frames, profiler.frames) == (1, 4)
+
+
+def test_work_percentiles_leave_out_the_wait():
+    profiler = FrameProfiler(enabled=True)
+    for _ in range(5):
+        frame(profiler, work=0.0, wait=0.01)
+    percentiles = profiler.percentiles()
+    assert percentiles["work"][2] < 5
+    assert percentiles["wait"][0] >= 10
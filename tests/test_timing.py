@@ -0,0 +1,97 @@
+from typing import Callable, Dict, List, Set, Tuple
+
+import pygame
+import pytest
+
+from matching_game import ScienceGame
+from timing import ManualClock, ScaledClock
+
+FRAME = 1 / 60
+
+
+def click(pos: Tuple[int, int]) -> pygame.event.Event:
+    return pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=pos, button=1)
+
+
+def next_clicks(game: ScienceGame, mismatched: Set[int]) -> List[pygame.event.Event]:
+    # Clears the lowest color still on the board, but turns two different
+    # colors once per level so mismatches are part of the run
+    if not game.state.game_active or game.transition_active or game.engine.is_animating:
+        return []
+    by_color: Dict[int, List[Tuple[int, int]]] = {}
+    for position, tile in sorted(game.tiles.items()):
+        if not tile.matched and not tile.revealed:
+            by_color.setdefault(tile.color, []).append(position)
+    colors = sorted(by_color.values())
+    if len(colors) > 1 and game.state.matches_found == 1 and game.state.level not in mismatched:
+        mismatched.add(game.state.level)
+        pair = [colors[0][0], colors[1][0]]
+    else:
+        pair = colors[0]
+    return [click(game.tile_rect(position).center) for position in pair]
+
+
+def play(clock: Callable[[], float], advance: Callable[[], None], seed: int) -> tuple:
+    # The frame loop of ScienceGame.run(), without the wait for the display
+    game = ScienceGame(clock=clock, seed=seed, music=False, sound=False)
+    game.running = True
+    trace = []
+    mismatched: Set[int] = set()
+    events = [click(game.start_button.rect.center)]
+    last_time = clock()
+    while game.running:
+        now = clock()
+        steps = game.timestep.advance(now - last_time)
+        last_time = now
+        for event in events:
+            game.handle_event(event, game.timestep.time)
+            trace.append((game.timestep.steps, game.state.level, game.state.score))
+        for _ in range(steps):
+            if game.running:
+                game.step(game.timestep.tick())
+        if game.running:
+            game.render()
+        events = next_clicks(game, mismatched)
+        advance()
+    game.board_pool.close()
+    state = game.state
+    return state.score, state.game_time, state.matches_found, state.game_complete, game.timestep.steps, trace
+
+
+def manual_run(seed: int) -> tuple:
+    clock = ManualClock()
+    return play(clock, lambda: clock.advance(FRAME), seed)
+
+
+def scaled_run(seed: int, scale: float) -> tuple:
+    # Wall time is a manual clock too, so the test never depends on how fast it runs
+    wall = ManualClock()
+    return play(ScaledClock(scale, base=wall), lambda: wall.advance(FRAME), seed)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def display():
+    # Fonts cached by text_cache outlive a pygame.quit(), so quit once at the end
+    yield
+    pygame.quit()
+
+
+def test_manual_clock_run_reproduces_exactly():
+    first = manual_run(seed=1)
+    assert first[3], "the scripted player should finish the game"
+    assert manual_run(seed=1) == first
+
+
+def test_scaled_clock_run_reproduces_exactly():
+    first = scaled_run(seed=1, scale=100)
+    assert first[3], "the scripted player should finish the game"
+    assert scaled_run(seed=1, scale=100) == first
+
+
+def test_scaled_clock_reaches_the_same_result():
+    # Fewer, longer frames: clicks land on later steps, so the game takes
+    # longer in simulated time, but the deals and the score are the same
+    manual, scaled = manual_run(seed=1), scaled_run(seed=1, scale=100)
+    score, _, matches, complete = manual[:4]
+    assert (scaled[0], scaled[2], scaled[3]) == (score, matches, complete)
+    assert scaled[1] > manual[1]
@@ -0,0 +1,55 @@
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import pygame
+
+Color = Tuple[int, int, int]
+
+
+class FontRegistry:
+    # Fonts are keyed by (face, size); face None is pygame's default font
+    def __init__(self):
+        self._fonts: Dict[Tuple[Optional[str], int], pygame.font.Font] = {}
+
+    def get(self, face: Optional[str], size: int) -> pygame.font.Font:
+        key = (face, size)
+        font = self._fonts.get(key)
+        if font is None:
+            font = self._fonts[key] = pygame.font.Font(face, size)
+        return font
+
+    def clear(self) -> None:
+        self._fonts.clear()
+
+
+class TextCache:
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._surfaces: "OrderedDict[Tuple[str, pygame.font.Font, Color, bool], pygame.Surface]" = OrderedDict()
+
+    def render(self, text: str, font: pygame.font.Font, color: Color, antialias: bool = True) -> pygame.Surface:
+        key = (text, font, color, antialias)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self._surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.max_entries:
+            self._surfaces.popitem(last=False)
+        return surface
+
+    def clear(self) -> None:
+        self._surfaces.clear()
+
+    def __len__(self) -> int:
+        return len(self._surfaces)
+
+
+fonts = FontRegistry()
+text_cache = TextCache()
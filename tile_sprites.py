@@ -0,0 +1,108 @@
+import math
+from typing import Dict, Iterable, Optional, Tuple
+
+import pygame
+
+Color = Tuple[int, int, int]
+
+HIDDEN_COLOR = (60, 80, 100)
+HIDDEN_OUTLINE_COLOR = (80, 100, 120)
+HIDDEN_RING_COLOR = (100, 150, 200)
+REVEALED_RING_COLOR = (255, 255, 255)
+BORDER_RADIUS = 20
+
+
+class TileSpriteCache:
+    # Faces are keyed by tile color, None being the hidden back. Flip frames
+    # are keyed by (face, step) where step quantizes the horizontal scale.
+    def __init__(self, size: Tuple[int, int], flip_steps: int = 12):
+        self.size = size
+        self.flip_steps = flip_steps
+        self._faces: Dict[Optional[Color], pygame.Surface] = {}
+        self._flip_frames: Dict[Tuple[Optional[Color], int], Optional[pygame.Surface]] = {}
+        self._icons: Dict[Color, pygame.Surface] = {}
+
+    @property
+    def icon_size(self) -> int:
+        return max(int(min(self.size) * 0.6), 1)
+
+    def set_icons(self, icons: Dict[Color, pygame.Surface]) -> None:
+        # Element icons drawn on revealed faces; front sprites are re-rendered
+        self._icons = dict(icons)
+        self._faces = {None: self._faces[None]} if None in self._faces else {}
+        self._flip_frames = {key: frame for key, frame in self._flip_frames.items() if key[0] is None}
+
+    def _new_surface(self, size: Tuple[int, int]) -> pygame.Surface:
+        surface = pygame.Surface(size, pygame.SRCALPHA)
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert_alpha()
+        surface.fill((0, 0, 0, 0))
+        return surface
+
+    def _render_face(self, color: Optional[Color]) -> pygame.Surface:
+        surface = self._new_surface(self.size)
+        rect = surface.get_rect()
+        if color is not None:
+            pygame.draw.rect(surface, color, rect, border_radius=BORDER_RADIUS)
+            for radius in (15, 30):
+                pygame.draw.circle(surface, REVEALED_RING_COLOR, rect.center, radius, 1)
+            icon = self._icons.get(color)
+            if icon is not None:
+                surface.blit(icon, icon.get_rect(center=rect.center))
+        else:
+            pygame.draw.rect(surface, HIDDEN_COLOR, rect, border_radius=BORDER_RADIUS)
+            pygame.draw.rect(surface, HIDDEN_OUTLINE_COLOR, rect, 2, border_radius=BORDER_RADIUS)
+            for offset in range(0, 31, 15):
+                pygame.draw.circle(surface, HIDDEN_RING_COLOR, rect.center, offset, 1)
+        return surface
+
+    def _render_flip_frame(self, color: Optional[Color], step: int) -> Optional[pygame.Surface]:
+        scale = step / self.flip_steps
+        width = round(self.size[0] * scale)
+        if width <= 0:
+            return None
+        surface = self._new_surface((width, self.size[1]))
+        rect = surface.get_rect()
+        pygame.draw.rect(surface, color or HIDDEN_COLOR, rect, border_radius=BORDER_RADIUS)
+        if scale > 0.1:
+            if color is not None:
+                for radius in (15, 30):
+                    pygame.draw.circle(surface, REVEALED_RING_COLOR, rect.center, int(radius * scale), 1)
+                icon = self._icons.get(color)
+                if icon is not None:
+                    icon = pygame.transform.smoothscale(icon, (max(int(icon.get_width() * scale), 1), icon.get_height()))
+                    surface.blit(icon, icon.get_rect(center=rect.center))
+            else:
+                for offset in range(0, 31, 15):
+                    pygame.draw.circle(surface, HIDDEN_RING_COLOR, rect.center, int(offset * scale), 1)
+        return surface
+
+    def face(self, color: Optional[Color]) -> pygame.Surface:
+        surface = self._faces.get(color)
+        if surface is None:
+            surface = self._faces[color] = self._render_face(color)
+        return surface
+
+    def flip_frame(self, color: Color, progress: float) -> Optional[pygame.Surface]:
+        # The back is shown for the first half of the flip, the front after
+        face = color if progress >= 0.5 else None
+        step = round(abs(math.cos(progress * math.pi)) * self.flip_steps)
+        key = (face, step)
+        if key not in self._flip_frames:
+            self._flip_frames[key] = self._render_flip_frame(face, step)
+        return self._flip_frames[key]
+
+    def prebuild(self, colors: Iterable[Color]) -> None:
+        for face in (None, *colors):
+            self.face(face)
+            for step in range(self.flip_steps + 1):
+                key = (face, step)
+                if key not in self._flip_frames:
+                    self._flip_frames[key] = self._render_flip_frame(face, step)
+
+    def memory_bytes(self) -> int:
+        surfaces = list(self._faces.values()) + [s for s in self._flip_frames.values() if s is not None]
+        return sum(s.get_width() * s.get_height() * s.get_bytesize() for s in surfaces)
+
+    def __len__(self) -> int:
+        return len(self._faces) + sum(1 for s in self._flip_frames.values() if s is not None)
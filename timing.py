@@ -0,0 +1,107 @@
+import heapq
+import itertools
+import time
+from typing import Callable, List, Tuple
+
+
+class ManualClock:
+    # A clock that only moves when told to, so simulated games run as fast as
+    # the CPU allows instead of waiting for flip and reset delays
+    def __init__(self, start: float = 0.0):
+        self.now = start
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> float:
+        self.now += seconds
+        return self.now
+
+    def advance_to(self, when: float) -> float:
+        # Lands on `when` exactly, where advance(when - now) may round off it
+        self.now = max(self.now, when)
+        return self.now
+
+
+class ScaledClock:
+    # Runs `scale` times faster (or slower) than the wrapped clock
+    def __init__(self, scale: float, base: Callable[[], float] = time.perf_counter):
+        self.scale = scale
+        self.base = base
+        self._origin = base()
+
+    def __call__(self) -> float:
+        return (self.base() - self._origin) * self.scale
+
+
+class Timer:
+    def __init__(self, due: float, callback: Callable[[], None]):
+        self.due = due
+        self.callback = callback
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        self.cancelled = True
+
+
+class TimerQueue:
+    # Delayed actions ordered by due time; ties fire in scheduling order so
+    # runs replay identically
+    def __init__(self):
+        self._heap: List[Tuple[float, int, Timer]] = []
+        self._counter = itertools.count()
+
+    def schedule(self, due: float, callback: Callable[[], None]) -> Timer:
+        timer = Timer(due, callback)
+        heapq.heappush(self._heap, (due, next(self._counter), timer))
+        return timer
+
+    def run_due(self, now: float) -> int:
+        fired = 0
+        while self._heap and self._heap[0][0] <= now:
+            _, _, timer = heapq.heappop(self._heap)
+            if not timer.cancelled:
+                timer.callback()
+                fired += 1
+        return fired
+
+    def next_due(self) -> float:
+        while self._heap and self._heap[0][2].cancelled:
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else float("inf")
+
+    def clear(self) -> None:
+        self._heap.clear()
+
+    def __len__(self) -> int:
+        return sum(1 for _, _, timer in self._heap if not timer.cancelled)
+
+
+class FixedTimestep:
+    # Turns variable frame times into a whole number of fixed simulation steps.
+    # Simulation time is always steps * step, never an accumulated float, so a
+    # run fed the same inputs at the same steps reproduces exactly.
+    def __init__(self, step: float = 1 / 120, max_steps: int = 240):
+        self.step = step
+        self.max_steps = max_steps
+        self.steps = 0
+        self.accumulator = 0.0
+
+    @property
+    def time(self) -> float:
+        return self.steps * self.step
+
+    def advance(self, elapsed: float) -> int:
+        self.accumulator += max(elapsed, 0.0)
+        count = int(self.accumulator // self.step)
+        if count > self.max_steps:
+            # Too far behind to catch up; drop the backlog instead of spiralling
+            count = self.max_steps
+            self.accumulator = 0.0
+        else:
+            self.accumulator -= count * self.step
+        return count
+
+    def tick(self) -> float:
+        self.steps += 1
+        return self.time